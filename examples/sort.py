@@ -63,21 +63,27 @@ def heap_sort(values: list) -> list:
     return result
 
 
+BASE_LIST = random_list()
+
+
+def make_list() -> list:
+    return BASE_LIST.copy()
+
+
 group = true_north.Group(name='sorting algorithms')
 
 
-@group.add(name='list.sort')
+# All algorithms modify the list in place, so each iteration needs a fresh copy.
+# With `per_iteration=True`, all copies are made before the timer starts
+# and the looper yields a new copy on each iteration.
+@group.add(name='list.sort', setup=make_list, per_iteration=True)
 def _(r):
-    base_list = random_list()
-    for _ in r:
-        a = base_list.copy()
+    for a in r:
         a.sort()
 
 
 def bench(func, r):
-    base_list = random_list()
-    for _ in r:
-        a = base_list.copy()
+    for a in r:
         func(a)
 
 
@@ -85,7 +91,8 @@ def bench(func, r):
 # so you can define benchmarks dynamically.
 FUNCS = (sorted, insert_sort, select_sort, bubble_sort, quick_sort, heap_sort)
 for func in FUNCS:
-    group.add(name=func.__name__)(partial(bench, func))
+    check = partial(bench, func)
+    group.add(name=func.__name__, setup=make_list, per_iteration=True)(check)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+from dataclasses import replace
+
+from true_north import Config, Group
+from true_north._cache import get_key
+
+
+def make_check(value: int, default: int = 1, args: tuple = ()):
+    group = Group(name='group')
+
+    def setup(*args):
+        return value
+
+    @group.add(setup=setup)
+    def check(r, x=default):
+        for _ in r:
+            value + x
+
+    return replace(check, args=args)
+
+
+def test_key_closure():
+    config = Config()
+    key = get_key(make_check(1), config=config)
+    assert get_key(make_check(1), config=config) == key
+    # closure variable of the benchmark and of the setup
+    assert get_key(make_check(2), config=config) != key
+    # default value of an argument
+    assert get_key(make_check(1, default=2), config=config) != key
+    # arguments passed into setup
+    assert get_key(make_check(1, args=(3,)), config=config) != key
+
+
+def test_key_closure_cell_changed():
+    config = Config()
+    check = make_check(1)
+    key = get_key(check, config=config)
+    cell = check.func.__closure__[0]
+    cell.cell_contents = 42
+    assert get_key(check, config=config) != key
@@ -0,0 +1,237 @@
+import json
+import os
+from io import StringIO
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from true_north import main
+
+
+SOURCE = """
+    import true_north
+
+    group = true_north.Group(name='{name}')
+
+    @group.add(loops=2, repeats=2)
+    def check(r):
+        for _ in r:
+            pass
+"""
+
+
+@pytest.fixture(autouse=True)
+def chdir_tmp(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # the results cache is stored in the current directory
+    monkeypatch.chdir(tmp_path)
+
+
+def make_files(root: Path) -> None:
+    for name in ('first', 'second', 'third'):
+        path = root / f'bench_{name}.py'
+        path.write_text(dedent(SOURCE.format(name=name)))
+
+
+def test_main(tmp_path: Path):
+    make_files(tmp_path)
+    stream = StringIO()
+    code = main([str(tmp_path / 'bench_first.py'), '--no-color'], stdout=stream)
+    assert code == 0
+    output = stream.getvalue()
+    assert output.startswith('first\n')
+    assert '  check\n' in output
+
+
+def test_jobs(tmp_path: Path):
+    make_files(tmp_path)
+    paths = [str(tmp_path / f'bench_{n}.py') for n in ('third', 'first', 'second')]
+    stream = StringIO()
+    code = main([*paths, '--no-color', '--jobs', '2'], stdout=stream)
+    assert code == 0
+    output = stream.getvalue()
+    names = [line for line in output.splitlines() if not line.startswith(' ')]
+    assert names == ['third', 'first', 'second']
+
+
+def test_output(tmp_path: Path):
+    make_files(tmp_path)
+    out_path = tmp_path / 'results.ndjson'
+    stream = StringIO()
+    code = main([str(tmp_path), '--output', str(out_path)], stdout=stream)
+    assert code == 0
+    records = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert sorted(r['group'] for r in records) == ['first', 'second', 'third']
+    for record in records:
+        assert record['check'] == 'check'
+        assert len(record['timing']['total_timings']) == 2
+        assert len(record['timing']['loop_timings']) == 2
+        assert record['env']['python']
+
+
+def test_group_discovery(tmp_path: Path):
+    make_files(tmp_path)
+    # the file must not be executed because it has no requested groups
+    (tmp_path / 'bench_broken.py').write_text('1/0')
+    cache_dir = tmp_path / 'cache'
+    for _ in range(2):
+        stream = StringIO()
+        code = main([
+            str(tmp_path), '--no-color', '--group', 'second',
+            '--cache-dir', str(cache_dir),
+        ], stdout=stream)
+        assert code == 0
+        output = stream.getvalue()
+        assert output.startswith('second\n')
+    assert (cache_dir / 'index.json').exists()
+
+
+def test_cache_results(tmp_path: Path):
+    make_files(tmp_path)
+    path = tmp_path / 'bench_first.py'
+    cache_dir = tmp_path / 'cache'
+    argv = [str(path), '--no-color', '--cache-results', '--cache-dir', str(cache_dir)]
+
+    def run(*extra: str) -> str:
+        stream = StringIO()
+        code = main([*argv, *extra], stdout=stream)
+        assert code == 0
+        return stream.getvalue()
+
+    assert '  check\n' in run()
+    output = run()
+    assert '  check (cached)\n' in output
+    assert 'loops, best of 2' in output
+    assert '  check\n' in run('--force')
+    # a different config
+    assert '  check\n' in run('--opcodes')
+    output = run('--opcodes')
+    assert '  check (cached)\n' in output
+    assert ' ops ' in output
+
+    # moving the function doesn't invalidate the cache
+    path.write_text('\n' + path.read_text())
+    assert '  check (cached)\n' in run()
+    path.write_text(path.read_text().replace('pass', 'len([])'))
+    assert '  check\n' in run()
+
+
+def test_history(tmp_path: Path):
+    make_files(tmp_path)
+    db = tmp_path / 'history.sqlite'
+    for _ in range(3):
+        args = [str(tmp_path), '--no-color', '--history', str(db), '--jobs', '2']
+        code = main(args, stdout=StringIO())
+        assert code == 0
+    stream = StringIO()
+    code = main(['history', str(db), '--no-color', '--group', 'first'], stdout=stream)
+    assert code == 0
+    lines = stream.getvalue().splitlines()
+    assert lines[:2] == ['first', '  check']
+    assert ' 3 runs: ' in lines[2]
+
+
+def test_check_system():
+    stream = StringIO()
+    code = main(['check-system', '--no-color'], stdout=stream)
+    assert code in (0, 1)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 5
+    assert (code == 1) == any(line.startswith('!!') for line in lines)
+
+
+@pytest.mark.parametrize('body', [
+    'for _ in r:\n        x = [1] * 10',
+    'for _ in r: x = [1] * 10',
+])
+def test_allocations_loop_only(tmp_path: Path, body: str):
+    path = tmp_path / 'bench.py'
+    path.write_text(dedent("""
+        import true_north
+
+        group = true_north.Group(name='loop')
+
+        @group.add(loops=10, repeats=2)
+        def check(r):
+            {body}
+    """).format(body=body))
+    stream = StringIO()
+    code = main([str(path), '--no-color', '--allocations'], stdout=stream)
+    assert code == 0
+    assert ' allocs ' in stream.getvalue()
+    assert ' 0 samples' not in stream.getvalue()
+
+
+def test_progress(tmp_path: Path, capsys):
+    make_files(tmp_path)
+    stream = StringIO()
+    code = main([str(tmp_path), '--no-color', '--progress'], stdout=stream)
+    assert code == 0
+    assert stream.getvalue().startswith('first')
+    lines = capsys.readouterr().err.splitlines()
+    assert 'first / check: repeats 0/2' in lines
+
+
+def test_pin(tmp_path: Path):
+    make_files(tmp_path)
+    stream = StringIO()
+    before = os.sched_getaffinity(0) if hasattr(os, 'sched_getaffinity') else None
+    try:
+        code = main([str(tmp_path), '--no-color', '--pin'], stdout=stream)
+    finally:
+        if before is not None:
+            os.sched_setaffinity(0, before)
+    assert code == 0
+    assert stream.getvalue().startswith('first')
+
+
+@pytest.mark.parametrize('flags', [
+    ['--isolate', 'check'],
+    ['--isolate', 'group'],
+    ['--warm-fork'],
+])
+def test_isolate(tmp_path: Path, flags: list):
+    path = tmp_path / 'bench.py'
+    path.write_text(dedent("""
+        import multiprocessing
+        import true_north
+
+        group = true_north.Group(name='isolated')
+
+        @group.add(loops=2, repeats=2)
+        def first(r):
+            for _ in r:
+                assert multiprocessing.parent_process() is not None
+
+        @group.add(loops=2, repeats=2)
+        def second(r):
+            for _ in r:
+                pass
+    """))
+    out_path = tmp_path / 'results.ndjson'
+    stream = StringIO()
+    args = [str(path), '--no-color', '--output', str(out_path), *flags]
+    code = main(args, stdout=stream)
+    assert code == 0
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == 'isolated'
+    assert lines[1] == '  first'
+    assert '  second' in lines
+    records = [json.loads(line) for line in out_path.read_text().splitlines()]
+    assert [r['check'] for r in records] == ['first', 'second']
+    assert 'comparison' in records[1]['timing']
+
+
+def test_isolate_error(tmp_path: Path):
+    path = tmp_path / 'bench.py'
+    path.write_text(dedent("""
+        import true_north
+
+        group = true_north.Group(name='broken')
+
+        @group.add(loops=2, repeats=2)
+        def check(r):
+            raise ZeroDivisionError('oh no')
+    """))
+    with pytest.raises(RuntimeError, match='oh no'):
+        main([str(path), '--no-color', '--isolate', 'check'], stdout=StringIO())
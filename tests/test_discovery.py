@@ -0,0 +1,71 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from true_north._discovery import Index, find_groups, load_code
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('', []),
+    ('import true_north\ng = true_north.Group("a")', ['a']),
+    ('import true_north as tn\ng = tn.Group(name="a")', ['a']),
+    ('from true_north import Group\ng = Group("a")\nh = Group("b")', ['a', 'b']),
+    ('from true_north import Group as G\ng = G("a")', ['a']),
+    ('from true_north import Group\n\ng = Group()', ['bench.py:3']),
+    ('from true_north import Group\ng = Group(None)', ['bench.py:2']),
+    ('from true_north import Group\ng = Group(NAME)', None),
+    ('from true_north import Group\ng = Group(f"{x}")', None),
+    ('from true_north import Group\ng = Group(**kwargs)', None),
+    ('g = something.Group(NAME)', []),
+    # groups that can be created indirectly
+    ('from true_north import Group\ndef f():\n    return Group("a")\ng = f()', None),
+    ('from true_north import Group\ngs = [Group(n) for n in "ab"]', None),
+    ('from true_north import Group\nfor n in "ab":\n    g = Group(n)', None),
+    ('from helpers import group', None),
+    ('from .helpers import group', None),
+    ('import helpers\ng = helpers.make_group()', None),
+    ('import true_north\nimport helpers\ng = true_north.Group("a")', ['a']),
+    ('import helpers\ndef f():\n    return helpers.x', []),
+    ('import true_north\nclass A:\n    g = true_north.Group("a")', None),
+])
+def test_find_groups(source, expected):
+    assert find_groups(source, path=Path('bench.py')) == expected
+
+
+def test_index(tmp_path: Path):
+    path = tmp_path / 'bench.py'
+    path.write_text('from true_north import Group\ng = Group("a")\n')
+    index = Index(tmp_path / 'cache')
+    assert index.get_groups(path) == ['a']
+    assert index.has_groups(path, ['a', 'b'])
+    assert not index.has_groups(path, ['b'])
+    index.save()
+
+    # the cached index is used when the file is not changed
+    index = Index(tmp_path / 'cache')
+    assert index._files
+    assert index.get_groups(path) == ['a']
+    assert not index._changed
+
+    path.write_text('from true_north import Group\ng = Group("bb")\n')
+    assert index.get_groups(path) == ['bb']
+
+
+def test_load_code(tmp_path: Path):
+    path = tmp_path / 'bench.py'
+    path.write_text(dedent("""
+        x = 13
+    """))
+    cache_dir = tmp_path / 'cache'
+    for _ in range(2):
+        globals: dict = {}
+        exec(load_code(path, cache_dir=cache_dir), globals)
+        assert globals['x'] == 13
+    assert len(list((cache_dir / 'code').iterdir())) == 1
+
+    path.write_text('x = 14')
+    globals = {}
+    exec(load_code(path, cache_dir=cache_dir), globals)
+    assert globals['x'] == 14
+    assert len(list((cache_dir / 'code').iterdir())) == 2
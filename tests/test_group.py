@@ -1,5 +1,9 @@
+import asyncio
+import threading
 from io import StringIO
 
+import pytest
+
 from true_north import Config, Group
 
 
@@ -23,3 +27,303 @@ def test_smoke():
     assert '█' in output
     assert 'best of 3:' in output
     assert '2    loops' in output
+
+
+def test_precision():
+    g = Group(name='gname')
+    ticks = iter(range(0, 10 ** 6, 7))
+
+    def timer():
+        # make every repeat take a different time
+        return next(ticks) ** 1.5
+
+    @g.add(loops=2, repeats=3, precision=0, max_repeats=7, timer=timer)
+    def _(r):
+        for _ in r:
+            pass
+
+    stream = StringIO()
+    g.print(Config(stream=stream))
+    assert 'best of 7:' in stream.getvalue()
+
+
+def test_async():
+    g = Group(name='gname')
+    called = 0
+
+    @g.add(loops=2, repeats=3)
+    async def func_name(r):
+        nonlocal called
+        called += 1
+        items = []
+        async for i in r:
+            await asyncio.sleep(0)
+            items.append(i)
+        assert items == list(range(len(items)))
+
+    stream = StringIO()
+    g.print(Config(stream=stream, opcodes=True))
+    assert called == 5
+    output = stream.getvalue()
+    assert 'best of 3:' in output
+    assert 'in event loop' in output
+    assert ' ops ' in output
+
+
+def test_threads():
+    g = Group(name='gname')
+    threads = set()
+
+    @g.add(loops=2, repeats=3)
+    def _(r):
+        threads.add(threading.get_ident())
+        for _ in r:
+            pass
+
+    stream = StringIO()
+    g.print(Config(stream=stream, threads=3))
+    # thread IDs can be reused, so the exact number is unknown
+    assert len(threads) > 1
+    output = stream.getvalue()
+    assert '1 threads' in output
+    assert '2 threads' in output
+    assert '3 threads' in output
+
+
+def test_threads_async():
+    g = Group(name='gname')
+
+    @g.add(loops=200, repeats=5)
+    async def check(r):
+        async for _ in r:
+            await asyncio.sleep(0)
+
+    report = check.print_report(Config(stream=StringIO(), threads=2))
+    assert report.scaling is not None
+    efficiency = report.scaling.efficiencies[0]
+    assert efficiency == pytest.approx(1, abs=.3)
+
+
+def test_sizes():
+    g = Group(name='gname')
+    sizes = []
+
+    @g.add(loops=2, repeats=3, sizes=[100, 10])
+    def _(r, n):
+        sizes.append(n)
+        for _ in r:
+            pass
+
+    stream = StringIO()
+    g.print(Config(stream=stream, opcodes=True))
+    assert sizes == [10] * 4 + [100] * 4 + [100]
+    output = stream.getvalue()
+    assert 'n= 10' in output
+    assert 'n=100' in output
+    assert 'O(' in output
+    assert ' ops ' in output
+
+
+@pytest.mark.parametrize('per_iteration', [False, True])
+def test_setup(per_iteration: bool):
+    g = Group(name='gname')
+    created = []
+    removed = []
+
+    def setup() -> list:
+        value = [len(created)]
+        created.append(value)
+        return value
+
+    @g.add(loops=3, repeats=2, setup=setup, teardown=removed.append,
+           per_iteration=per_iteration)
+    def _(r):
+        values = list(r)
+        assert len(values) == r.loops
+        if per_iteration:
+            assert len({id(v) for v in values}) == r.loops
+        else:
+            assert len({id(v) for v in values}) == 1
+
+    stream = StringIO()
+    g.print(Config(stream=stream, opcodes=True))
+    assert created
+    assert removed == created
+    # each loop, 2 repeats, opcodes
+    if per_iteration:
+        assert len(created) == 3 + 3 * 2 + 1
+    else:
+        assert len(created) == 1 + 2 + 1
+
+
+def test_setup_sizes():
+    g = Group(name='gname')
+
+    @g.add(loops=2, repeats=2, sizes=[10, 20], setup=lambda n: list(range(n)))
+    def _(r, n):
+        for value in r:
+            assert len(value) == n
+
+    g.print(Config(stream=StringIO()))
+
+
+def test_hot_lines():
+    g = Group(name='gname')
+
+    @g.add(loops=2, repeats=2)
+    def _(r):
+        for _ in r:
+            sorted([3, 2, 1])
+
+    stream = StringIO()
+    g.print(Config(stream=stream, hot_lines=2))
+    output = stream.getvalue()
+    assert 'test_group.py:' in output
+    assert 'sorted([3, 2, 1])' in output
+
+
+def test_hot_lines_async():
+    g = Group(name='gname')
+
+    @g.add(loops=2, repeats=2)
+    async def _(r):
+        async for _ in r:
+            await asyncio.sleep(0)
+
+    stream = StringIO()
+    g.print(Config(stream=stream, hot_lines=5))
+    output = stream.getvalue()
+    assert 'asyncio.sleep(0)' in output
+    # the code of true-north itself is never traced
+    assert '_aio.py' not in output
+
+
+def test_opnames():
+    g = Group(name='gname')
+
+    @g.add(loops=1, repeats=2)
+    def base(r):
+        for _ in r:
+            pass
+
+    @g.add(loops=1, repeats=2)
+    def attrs(r):
+        for _ in r:
+            str.upper
+            str.lower
+
+    stream = StringIO()
+    g.print(Config(stream=stream, opnames=True))
+    output = stream.getvalue()
+    assert 'FOR_ITER' in output
+    assert 'vs base: LOAD_ATTR +2  ' in output
+
+
+def test_counters():
+    g = Group(name='gname')
+
+    @g.add(loops=2, repeats=2)
+    def _(r):
+        for _ in r:
+            sorted([3, 2, 1])
+
+    stream = StringIO()
+    g.print(Config(stream=stream, counters=True))
+    output = stream.getvalue()
+    # perf events are often not available in containers and VMs
+    assert 'best of 2' in output
+    assert 'per loop' in output or 'hardware counters are not available' in output
+
+
+@pytest.mark.parametrize('start, runs', [
+    (1,         3),     # probe 1 and 10 loops, then extrapolate to 240
+    (240,       1),     # the cached number of loops is still good
+    (10_000,    2),     # the code got faster, extrapolate down
+])
+def test_autorange(start: int, runs: int):
+    now = 0.
+    calls = []
+
+    def timer() -> float:
+        return now
+
+    g = Group(name='gname')
+
+    @g.add(min_time=.2, timer=timer)
+    def _(r):
+        nonlocal now
+        calls.append(r.loops)
+        for _ in r:
+            now += .001
+
+    check = g._checks[0]
+    loops, repeat = check._autorange(start=start)
+    assert loops == pytest.approx(240, abs=1)
+    assert repeat.total == pytest.approx(.24, rel=.01)
+    assert len(calls) == runs
+
+
+def test_autorange_warmup():
+    now = 0.
+    iterations = 0
+
+    def timer() -> float:
+        return now
+
+    g = Group(name='gname')
+
+    @g.add(min_time=.2, repeats=2, timer=timer)
+    def _(r):
+        nonlocal now, iterations
+        for _ in r:
+            iterations += 1
+            # the first 300 iterations ever are 10 times slower
+            now += .0001 if iterations <= 300 else .00001
+
+    result = g._checks[0].check_timing()
+    assert result.warmup == 300
+    assert len(result.loop_timings) > 10_000
+
+
+def test_loops_cache(tmp_path):
+    g = Group(name='gname')
+
+    @g.add(min_time=.001)
+    def _(r):
+        for _ in r:
+            pass
+
+    config = Config(stream=StringIO(), loops_cache=tmp_path)
+    g.print(config)
+    cached = list(tmp_path.iterdir())
+    assert len(cached) == 1
+    assert int(cached[0].read_text()) > 1
+    g.print(config)
+
+
+def test_memory():
+    g = Group(name='gname')
+    cache = []
+
+    @g.add(loops=2, repeats=3, setup=lambda: [0] * 100_000)
+    def _(r):
+        for _ in r:
+            [0] * 10_000
+            cache.append([0] * 1000)
+
+    check = g._checks[0]
+    result = check.check_memory(repeats=3)
+    assert len(result.peaks) == 3
+    assert 80_000 < result.peak < 200_000
+    assert 8_000 < result.net < 20_000
+
+    stream = StringIO()
+    g.print(Config(stream=stream, memory=True))
+    assert ' peak ' in stream.getvalue()
+
+
+@pytest.mark.parametrize('sizes', [[0, 10], [10, -1]])
+def test_sizes_not_positive(sizes):
+    g = Group(name='gname')
+    with pytest.raises(ValueError, match='sizes must be positive'):
+        g.add(sizes=sizes)
@@ -0,0 +1,65 @@
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from true_north._history import History, find_regression, print_history
+from true_north._report import Report
+from true_north._results import TimingResult
+
+
+@pytest.mark.parametrize('values, expected', [
+    ([],                    None),
+    ([1, 1, 1],             None),
+    ([1, 2, 2],             1),
+    ([1, 1, 2, 2],          2),
+    ([2, 1, 2, 2],          2),
+    ([1, 2, 1, 2],          3),
+    ([1, 2, 1.05],          None),
+    ([3, 2, 1],             None),
+])
+def test_find_regression(values, expected):
+    assert find_regression(values) == expected
+
+
+def make_report(check: str, best: float) -> Report:
+    timing = TimingResult(total_timings=[best, best * 2], each_timings=[best] * 2)
+    return Report(group='group', check=check, timing=timing)
+
+
+def test_history(tmp_path: Path):
+    path = tmp_path / 'history.sqlite'
+    for best in (1, 1, 2):
+        with History(path) as history:
+            history.start_run()
+            history.add(make_report('fast', best=1))
+            history.add(make_report('slow', best=best))
+            # results are written in batches
+            assert len(history.get_points('group', 'slow')) == history.run - 1
+    with History(path) as history:
+        assert history.get_checks() == [('group', 'fast'), ('group', 'slow')]
+        points = history.get_points('group', 'slow')
+        assert [p.value for p in points] == [1, 1, 2]
+        assert [p.run for p in points] == [1, 2, 3]
+        points = history.get_points('group', 'slow', limit=2)
+        assert [p.value for p in points] == [1, 2]
+        assert history.get_points('group', 'slow', fingerprint='nope') == []
+        assert history.get_points('group', 'slow', metric='opcodes') == []
+
+        stream = StringIO()
+        print_history(history, stream=stream)
+    output = stream.getvalue()
+    assert output.count('regressed in') == 1
+
+
+def test_print_history_zero(tmp_path: Path):
+    path = tmp_path / 'history.sqlite'
+    for best in (5, 0):
+        with History(path) as history:
+            history.start_run()
+            history.add(make_report('check', best=best))
+    stream = StringIO()
+    with History(path) as history:
+        print_history(history, stream=stream)
+    lines = stream.getvalue().splitlines()
+    assert lines[2].strip().endswith('→ 0.000 ns')
@@ -0,0 +1,141 @@
+import sys
+from time import perf_counter
+
+import pytest
+
+from true_north._loopers import (
+    MemoryLooper, OpcodeLooper, TimingsBuffer, TimingsHistogram, TotalLooper,
+)
+
+
+def double(x):
+    return x * 2
+
+
+def bench(r):
+    data = list(range(20))
+    for _ in r:
+        for x in data:
+            double(x)
+
+
+@pytest.mark.parametrize('monitoring', [True, False])
+def test_opcode_looper(monitoring):
+    looper = OpcodeLooper(loops=3, monitoring=monitoring)
+    bench(looper)
+    assert looper.opcodes > 3 * 20 * 4
+    assert looper.lines > 3 * 20 * 2
+    assert len(looper.timings) == looper.opcodes
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason='no sys.monitoring')
+def test_opcode_looper_keeps_other_tools():
+    mon = sys.monitoring
+    tool_id = mon.OPTIMIZER_ID
+    calls = []
+
+    def on_start(code, offset):
+        if code is double.__code__:
+            calls.append(code)
+            return mon.DISABLE
+
+    mon.use_tool_id(tool_id, 'test')
+    mon.register_callback(tool_id, mon.events.PY_START, on_start)
+    mon.set_events(tool_id, mon.events.PY_START)
+    try:
+        double(1)
+        bench(OpcodeLooper(loops=3))
+        double(1)
+    finally:
+        mon.set_events(tool_id, 0)
+        mon.register_callback(tool_id, mon.events.PY_START, None)
+        mon.free_tool_id(tool_id)
+    # the event disabled by the other tool stays disabled
+    assert len(calls) == 1
+
+
+def test_opcode_looper_rerun():
+    # functions called by the benchmark are traced on each run
+    opcodes = []
+    for _ in range(3):
+        looper = OpcodeLooper(loops=3)
+        bench(looper)
+        opcodes.append(looper.opcodes)
+    assert opcodes[0] == opcodes[1] == opcodes[2]
+
+
+@pytest.mark.parametrize('monitoring', [True, False])
+def test_opcode_looper_line_stats(monitoring):
+    stats: dict = {}
+    looper = OpcodeLooper(loops=3, monitoring=monitoring, line_stats=stats)
+    bench(looper)
+    assert sum(ops for ops, _ in stats.values()) == looper.opcodes
+    lines = {lineno for _, lineno in stats}
+    code = double.__code__
+    assert code.co_firstlineno + 1 in lines
+    assert all(fname == __file__ for fname, _ in stats)
+    assert all(ns >= 0 for _, ns in stats.values())
+
+
+def test_opcode_looper_backends_agree():
+    mlooper = OpcodeLooper(loops=3, monitoring=True)
+    bench(mlooper)
+    tlooper = OpcodeLooper(loops=3, monitoring=False)
+    bench(tlooper)
+    assert mlooper.opcodes == pytest.approx(tlooper.opcodes, rel=.05)
+
+
+@pytest.mark.parametrize('monitoring', [True, False])
+def test_memory_looper(monitoring):
+    looper = MemoryLooper(period=5, loops=3, monitoring=monitoring)
+    bench(looper)
+    assert looper.lines >= 3 * 20
+    assert len(looper.totals) == len(looper.allocs)
+    assert len(looper.totals) == looper.lines // 5
+
+
+@pytest.mark.parametrize('monitoring', [True, False])
+def test_memory_looper_incremental(monitoring):
+    looper = MemoryLooper(period=2, loops=3, monitoring=monitoring, incremental=True)
+    bench(looper)
+    assert len(looper.totals) == looper.lines // 2
+    assert 0 < len(looper.allocs) < len(looper.totals)
+    for allocs in looper.allocs:
+        assert all(count > 0 for count in allocs.values())
+
+
+def test_timings_buffer_spill():
+    timestamps = [i * i for i in range(1000)]
+    buffer = TimingsBuffer(budget=8 * 64)
+    for timestamp in timestamps:
+        buffer.append(timestamp)
+    assert len(buffer) == 1000
+    assert list(buffer) == timestamps
+    assert list(buffer.durations()) == [2 * i + 1 for i in range(999)]
+    assert len(buffer.histogram(64)) == 63
+
+
+@pytest.mark.parametrize('count', [2, 10, 100, 1000, 1001])
+def test_timings_histogram(count):
+    buffer = TimingsBuffer()
+    hist = TimingsHistogram(buckets=8)
+    for i in range(count):
+        buffer.append(i * 3)
+        hist.append(i * 3)
+    assert len(hist) == count
+    assert hist.histogram(8) == [3] * len(hist.histogram(8))
+    assert 0 < len(hist.histogram(8)) <= 8
+    assert set(buffer.histogram(8)) == {3}
+    assert list(hist.durations()) == list(buffer.durations())
+    assert list(hist) == list(buffer)
+
+
+def test_total_looper_usage():
+    looper = TotalLooper(loops=10, timer=perf_counter)
+    bench(looper)
+    if sys.platform == 'win32':
+        assert looper.usage == {}
+        return
+    assert looper.usage['user'] >= 0
+    assert looper.usage['major_faults'] >= 0
+    assert 'involuntary_switches' in looper.usage
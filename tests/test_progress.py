@@ -0,0 +1,86 @@
+from io import StringIO
+
+import pytest
+
+from true_north import Group
+from true_north._progress import Progress, format_eta
+
+
+class TTY(StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+@pytest.mark.parametrize('seconds, expected', [
+    (0,         '0.0s'),
+    (4.25,      '4.2s'),
+    (59.9,      '59.9s'),
+    (65,        '1m 5s'),
+    (3599,      '59m 59s'),
+    (3900,      '1h 5m'),
+])
+def test_format_eta(seconds, expected):
+    assert format_eta(seconds) == expected
+
+
+def test_progress_eta():
+    progress = Progress(StringIO())
+    progress.start(group='math', check='sin')
+    progress.phase('repeats', total=4, estimate=.5)
+    assert progress.eta == pytest.approx(2)
+    assert progress.format_text() == 'math / sin: repeats 0/4, ETA 2.0s'
+    progress.phase('repeats', total=4, estimate=10, deadline=0)
+    assert progress.eta == 0
+    progress.phase('opcodes')
+    assert progress.eta is None
+    assert progress.format_text() == 'math / sin: opcodes'
+
+
+def test_progress_stream():
+    stream = StringIO()
+    progress = Progress(stream)
+    progress.start(group='math', check='sin')
+    progress.phase('calibration')
+    progress.step()
+    progress.clear()
+    assert stream.getvalue() == 'math / sin: calibration\n'
+
+    stream = TTY()
+    progress = Progress(stream)
+    progress.start(group='math', check='sin')
+    progress.phase('calibration')
+    progress.clear()
+    progress.clear()
+    assert stream.getvalue() == '\r\x1b[Kmath / sin: calibration\r\x1b[K'
+
+    stream = TTY()
+    progress = Progress(stream)
+    progress.start(group='math', check='sin')
+    with progress.phase('memory'):
+        assert stream.getvalue() == '\r\x1b[Kmath / sin: memory'
+    assert stream.getvalue() == '\r\x1b[Kmath / sin: memory\r\x1b[K'
+
+
+def test_progress_disabled():
+    progress = Progress()
+    progress.start(group='math', check='sin')
+    with progress.phase('repeats', total=2, estimate=1):
+        progress.step()
+    assert progress.format_text().startswith('math / sin: repeats 1/2, ETA ')
+
+
+def test_check_timing_progress():
+    group = Group()
+
+    @group.add(repeats=3)
+    def check(r):
+        for _ in r:
+            pass
+
+    stream = StringIO()
+    progress = Progress(stream)
+    progress.start(group='group', check='check')
+    check.check_timing(progress=progress)
+    lines = stream.getvalue().splitlines()
+    assert lines[0] == 'group / check: calibration'
+    assert lines[-1].startswith('group / check: repeats 0/2, ETA ')
@@ -1,8 +1,14 @@
 import math
+from collections import Counter
+from time import perf_counter
 
 import pytest
 
-from true_north._results import TimingResult
+from true_north._calibration import Overhead, get_overhead
+from true_north._loopers import TimingsHistogram
+from true_north._results import (
+    MemoryResult, OpcodesResult, ScalingResult, TimingResult,
+)
 from true_north._results._formatters import format_time
 
 
@@ -21,6 +27,8 @@ from true_north._results._formatters import format_time
     ([2, 1, 3],     '▆▃█'),
     ([1, 2, 3],     '▃▆█'),
     ([0, 3],        '▁█'),
+    ([1] * 100,     '█' * 50),
+    ([1, 3] * 50,   '█' * 50),
 ])
 def test_histogram(timings, hist):
     r = TimingResult(
@@ -68,3 +76,222 @@ def test_get_text():
 ])
 def test_format_time(given, expected):
     assert format_time(given) == expected
+
+
+def test_overhead():
+    overhead = Overhead(total=.5, each=1, floor=.01)
+    r = TimingResult(
+        total_timings=[1, 2, 3],
+        each_timings=[4, 5, 6, .5],
+        overhead=overhead,
+    )
+    assert r.total_timings == [.5, 1.5, 2.5]
+    assert r.loop_timings == [3, 4, 5, 0]
+    assert r.overhead == .5
+    assert r.floor == .01
+    assert r.format_warnings() == []
+
+    r = TimingResult(
+        total_timings=[1, 2, 3],
+        each_timings=[4, 5, 6],
+        overhead=Overhead(total=.5, each=1, floor=.1),
+    )
+    assert r.to_dict()['overhead'] == .5
+    warnings = r.format_warnings()
+    assert len(warnings) == 1
+    assert warnings[0].startswith('close to the measurement floor')
+
+
+def test_get_overhead():
+    overhead = get_overhead(perf_counter)
+    assert overhead is get_overhead(perf_counter)
+    assert 0 < overhead.total < 1e-5
+    assert 0 < overhead.each < 1e-5
+    assert overhead.floor >= 0
+
+
+@pytest.mark.parametrize('timings, suffix', [
+    ([2, 2.1, 2.2, 2.1, 2.3],   '   x2.00 slower'),
+    ([1.1, 1, 1.2, .9, 1.3],    '   /1.11 faster (not significant)'),
+])
+def test_get_text_compare(timings, suffix):
+    base = TimingResult(
+        total_timings=[1, 1.1, 1.2, 1.1, 1.3],
+        each_timings=[4, 5, 6, 7],
+    )
+    r = TimingResult(
+        total_timings=timings,
+        each_timings=[4, 5, 6, 7],
+    )
+    r._base_time = base.best
+    r._comparison = r.compare(base)
+    assert r.format_text().endswith(suffix)
+    assert r.to_dict()['comparison']['significant'] == r._comparison.significant
+
+
+@pytest.mark.parametrize('best, base_time', [
+    (1, 0),
+    (0, 1),
+    (0, 0),
+])
+def test_get_text_compare_zero(best, base_time):
+    overhead = Overhead(total=1, each=0, floor=.1)
+    r = TimingResult(
+        total_timings=[best + 1, best + 1.1],
+        each_timings=[4, 5, 6, 7],
+        overhead=overhead,
+    )
+    r._base_time = base_time
+    assert r.format_text().endswith('below measurement floor')
+
+
+def test_opcodes_durations():
+    timings = TimingsHistogram(buckets=2)
+    for timestamp in (10, 12, 16, 17, 20):
+        timings.append(timestamp)
+    r = OpcodesResult(opcodes=5, lines=1, timings=timings, best=1e-8)
+    assert len(r.durations) == 4
+    assert math.fsum(r.durations) == pytest.approx(10e-9)
+    assert r.timings[0] == 0
+    assert r.timings[-1] == pytest.approx(10e-9)
+
+
+def test_scaling():
+    r = ScalingResult(
+        threads=[1, 2, 4],
+        walls=[1, 1, 2],
+        latencies=[[.1], [.1, .1], [.2, .2, .2, .2]],
+        loops=10,
+        base=.1,
+    )
+    assert r.throughputs == [10, 20, 20]
+    assert r.latencies == [.1, .1, .2]
+    assert r.efficiencies == [1, 1, .5]
+    lines = r.format_text().splitlines()
+    assert len(lines) == 3
+    assert lines[2].split()[:2] == ['4', 'threads']
+    assert lines[2].endswith('50%')
+    restored = ScalingResult.from_dict(r.to_dict())
+    assert restored.format_text() == r.format_text()
+
+
+def test_scaling_zero_wall():
+    r = ScalingResult(
+        threads=[1, 2],
+        walls=[0, 1],
+        latencies=[[0], [.1, .1]],
+        loops=10,
+        base=0,
+    )
+    assert r.throughputs == [None, 20]
+    assert r.efficiencies == [None, None]
+    lines = r.format_text().splitlines()
+    assert lines[0].split()[2:4] == ['n/a', 'loops/s']
+    assert lines[0].endswith('n/a')
+    assert r.format_histogram(lines=1)
+
+
+def test_timing_from_dict():
+    overhead = Overhead(total=1, each=2, floor=.5)
+    r = TimingResult(total_timings=[5, 4, 6], each_timings=[4, 5], overhead=overhead)
+    restored = TimingResult.from_dict(r.to_dict())
+    assert restored.total_timings == [4, 3, 5]
+    assert restored.loop_timings == [2, 3]
+    assert restored.overhead == 1
+    assert restored.floor == .5
+    assert restored.format_text() == r.format_text()
+    assert restored.format_warnings() == r.format_warnings()
+
+
+def test_opcodes_diff():
+    def make(**opnames):
+        return OpcodesResult(
+            opcodes=sum(opnames.values()),
+            lines=1,
+            timings=TimingsHistogram(),
+            best=1,
+            opnames=Counter(opnames),
+        )
+
+    base = make(LOAD_FAST=3, CALL=2, NOP=1)
+    result = make(LOAD_FAST=3, CALL=1, LOAD_ATTR=4)
+    assert result.diff(base) == {'CALL': -1, 'LOAD_ATTR': 4, 'NOP': -1}
+    result._base = base
+    assert 'vs base: LOAD_ATTR +4  ' in result.format_text()
+    restored = OpcodesResult.from_dict(result.to_dict())
+    assert restored.opnames == result.opnames
+
+
+def test_timing_counters():
+    r = TimingResult(
+        total_timings=[2, 1],
+        each_timings=[1, 1],
+        counters=[
+            dict(instructions=3000, cycles=1500, branch_misses=4),
+            dict(instructions=2000, cycles=1000, branch_misses=5),
+        ],
+    )
+    assert r.best_counters == dict(instructions=2000, cycles=1000, branch_misses=4)
+    text = r.format_text()
+    assert '2k instructions, ' in text
+    assert '2.00 IPC' in text
+    assert 'cache misses' not in text
+    assert '4 branch misses per loop' in text
+    restored = TimingResult.from_dict(r.to_dict())
+    assert restored.counters == r.counters
+
+
+def test_warmup():
+    r = TimingResult(total_timings=[1, 1], each_timings=[9, 8, 7] + [2, 3] * 10)
+    assert r.warmup == 3
+    assert r.steady_timings == [2, 3] * 10
+    assert math.isclose(r.stdev, .5)
+    warnings = r.format_warnings()
+    assert len(warnings) == 1
+    assert 'first 3 iterations excluded, x3.2 slower' in warnings[0]
+    assert r.to_dict()['warmup'] == 3
+
+
+def test_warmup_single():
+    r = TimingResult(total_timings=[1, 1], each_timings=[40] + [2, 3] * 20)
+    assert r.warmup == 1
+    warnings = r.format_warnings()
+    assert len(warnings) == 1
+    assert 'warmup detected: first iteration excluded, x16.0 slower' in warnings[0]
+
+
+def test_memory_from_dict():
+    r = MemoryResult(peaks=[300, 200], nets=[100, 0], rss=None)
+    assert r.peak == 300
+    assert r.net == 0
+    assert 'RSS' not in r.format_text()
+    restored = MemoryResult.from_dict(r.to_dict())
+    assert restored.format_text() == r.format_text()
+
+
+def test_usage_warnings():
+    switches = dict(user=.01, system=0, involuntary_switches=2, major_faults=0)
+    clean = dict(user=.01, system=0, involuntary_switches=0, major_faults=0)
+    r = TimingResult(
+        total_timings=[1, 1.5, 1.05, 2],
+        each_timings=[1, 1],
+        usage=[clean, switches, switches, clean],
+    )
+    warnings = r.format_warnings()
+    assert len(warnings) == 1
+    assert 'preempted' in warnings[0]
+    assert '1 of 4 repeats had involuntary context switches, up to x1.5' in warnings[0]
+    restored = TimingResult.from_dict(r.to_dict())
+    assert restored.usage == r.usage
+
+
+def test_usage_warnings_rare_switches():
+    # 2 switches in a second of CPU time can't make the repeat 2 times slower
+    switches = dict(user=.9, system=.1, involuntary_switches=2, major_faults=0)
+    clean = dict(user=.5, system=0, involuntary_switches=0, major_faults=0)
+    r = TimingResult(
+        total_timings=[1, 2],
+        each_timings=[1, 1],
+        usage=[clean, switches],
+    )
+    assert r.format_warnings() == []
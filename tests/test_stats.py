@@ -0,0 +1,72 @@
+import math
+
+import pytest
+
+from true_north._stats import (
+    compare, find_warmup, fit_complexity, mann_whitney, relative_ci,
+)
+
+
+@pytest.mark.parametrize('samples, expected', [
+    ([],            math.inf),
+    ([1],           math.inf),
+    ([1, 1, 1],     0),
+    ([1, 2, 3],     1.242),
+    ([10, 11] * 50, .00938),
+])
+def test_relative_ci(samples, expected):
+    assert relative_ci(samples) == pytest.approx(expected, rel=.001)
+
+
+@pytest.mark.parametrize('a, b, expected', [
+    ([1, 2, 3, 4, 5],   [6, 7, 8, 9, 10],   .01219),
+    ([1, 2, 3, 4, 5],   [1, 2, 3, 4, 5],    1),
+    ([1, 1, 1],         [1, 1, 1],          1),
+    ([1, 3, 5, 7, 9],   [2, 4, 6, 8, 10],   .6761),
+])
+def test_mann_whitney(a, b, expected):
+    assert mann_whitney(a, b) == pytest.approx(expected, rel=.001)
+
+
+def test_compare():
+    base = [10, 11, 10.5, 10.2, 10.8, 10.1]
+    slower = [x * 1.5 for x in base]
+    result = compare(slower, base)
+    assert result.ratio == pytest.approx(1.5)
+    assert result.low > 1
+    assert result.significant
+
+    noisy = [10.3, 10.9, 10.4, 10.6, 10.0, 10.7]
+    result = compare(noisy, base)
+    assert result.low < 1 < result.high
+    assert not result.significant
+
+
+@pytest.mark.parametrize('func, expected', [
+    (lambda n: 5,                           'O(1)'),
+    (lambda n: 3 * math.log2(n),            'O(log n)'),
+    (lambda n: 3 * n + 1,                   'O(n)'),
+    (lambda n: 2 * n * math.log2(n) + 10,   'O(n log n)'),
+    (lambda n: n * n,                       'O(n²)'),
+])
+def test_fit_complexity(func, expected):
+    sizes = [10, 100, 1000, 10000]
+    fits = fit_complexity(sizes, [func(n) for n in sizes])
+    assert fits[0].name == expected
+    assert fits[0].rms < .01
+    assert fits[-1].rms > fits[0].rms
+
+
+@pytest.mark.parametrize('timings, expected', [
+    ([5] * 9 + [1] * 100,                       9),
+    ([5] + [1, 1.1] * 50,                       1),
+    ([3] * 30 + [1, 1.1] * 20_000,              30),
+    ([1, 1.1] * 50,                             0),
+    ([1] * 50 + [5] * 50,                       0),
+    ([1] * 100,                                 0),
+    ([5] * 5,                                   0),
+    ([5] * 60 + [1] * 100,                      0),
+    ([0] * 10 + [1] * 10,                       0),
+])
+def test_find_warmup(timings, expected):
+    assert find_warmup(timings) == expected
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from true_north._system import (
+    SystemCheck, check_system, get_system_info, parse_cpu_list, pin,
+)
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('',            []),
+    ('\n',          []),
+    ('3',           [3]),
+    ('0-2',         [0, 1, 2]),
+    ('0-2,5',       [0, 1, 2, 5]),
+    ('1,3-4,7',     [1, 3, 4, 7]),
+])
+def test_parse_cpu_list(text, expected):
+    assert parse_cpu_list(text) == expected
+
+
+def test_check_system():
+    checks = check_system()
+    names = [check.name for check in checks]
+    assert names == [
+        'CPU frequency governor',
+        'turbo boost',
+        'isolated CPUs',
+        'load average',
+        'ASLR',
+    ]
+    for check in checks:
+        assert isinstance(check, SystemCheck)
+        assert check.ok in (True, False, None)
+        assert check.name in check.format_text()
+
+
+def test_format_text():
+    check = SystemCheck('turbo boost', 'enabled', ok=False, advice='disable it')
+    assert check.format_text().endswith('turbo boost: enabled (disable it)')
+    check = SystemCheck('turbo boost', 'disabled', ok=True, advice='disable it')
+    assert check.format_text().endswith('turbo boost: disabled')
+
+
+def test_get_system_info():
+    info = get_system_info()
+    assert set(info) == {
+        'governors', 'turbo', 'isolated_cpus', 'load', 'aslr', 'cpus', 'priority',
+    }
+
+
+@pytest.mark.skipif(not hasattr(os, 'sched_setaffinity'), reason='not supported')
+def test_pin():
+    before = os.sched_getaffinity(0)
+    try:
+        cpu = pin(min(before))
+        assert cpu == min(before)
+        assert os.sched_getaffinity(0) == {cpu}
+    finally:
+        os.sched_setaffinity(0, before)
@@ -1,4 +1,7 @@
 from ._cli import entrypoint
 
 
-entrypoint()
+# The guard is needed for worker processes started with "spawn",
+# they import the main module but must not run the CLI.
+if __name__ == '__main__':
+    entrypoint()
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Coroutine, Generator, List, Tuple
+
+from ._loopers import Timer
+
+
+# Intervals of time (start and end) when a coroutine was suspended.
+Intervals = List[Tuple[float, float]]
+
+
+_local = threading.local()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """The event loop reused by all async checks running in the current thread.
+
+    The loop is created by the current event loop policy,
+    so it can be replaced by uvloop or any other implementation.
+    """
+    loop = getattr(_local, 'loop', None)
+    if loop is None:
+        loop = asyncio.new_event_loop()
+        _local.loop = loop
+    return loop
+
+
+def close_loop() -> None:
+    """Close the event loop of the current thread, if any.
+    """
+    loop = getattr(_local, 'loop', None)
+    if loop is not None:
+        loop.close()
+        _local.loop = None
+
+
+def use_uvloop() -> None:
+    """Use uvloop for all async checks.
+
+    Raises ImportError if uvloop is not installed.
+    """
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    close_loop()
+
+
+class Suspensions(Awaitable):
+    """Awaitable running the coroutine and recording when it was suspended.
+
+    The coroutine is suspended when it waits for the event loop to run
+    something else, like I/O callbacks or other tasks.
+    """
+    __slots__ = ('_coro', '_timer', '_intervals')
+
+    def __init__(self, coro: Coroutine, timer: Timer, intervals: Intervals) -> None:
+        self._coro = coro
+        self._timer = timer
+        self._intervals = intervals
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        coro = self._coro
+        value: Any = None
+        error: BaseException | None = None
+        while True:
+            try:
+                if error is None:
+                    future = coro.send(value)
+                else:
+                    future = coro.throw(error)
+            except StopIteration as exc:
+                return exc.value
+            suspended = self._timer()
+            try:
+                value = yield future
+                error = None
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as exc:
+                value = None
+                error = exc
+            self._intervals.append((suspended, self._timer()))
+
+
+def run(coro: Coroutine, timer: Timer) -> Intervals:
+    """Run the coroutine in the event loop.
+
+    Returns intervals of time when the coroutine was suspended.
+    """
+    intervals: Intervals = []
+
+    async def wrapper() -> None:
+        await Suspensions(coro, timer=timer, intervals=intervals)
+
+    get_loop().run_until_complete(wrapper())
+    return intervals
+
+
+def get_idle(intervals: Intervals, start: float, stop: float) -> float:
+    """How long the coroutine was suspended between start and stop.
+    """
+    idle = 0.
+    for suspended, resumed in intervals:
+        idle += max(0., min(resumed, stop) - max(suspended, start))
+    return idle
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import builtins
+import dataclasses
+import hashlib
+import json
+import platform
+import sys
+from functools import partial
+from pathlib import Path
+from types import CodeType, FunctionType, ModuleType
+from typing import TYPE_CHECKING, Callable, Iterator
+
+from ._config import Config
+from ._discovery import write_atomic
+from ._report import Report
+
+
+if TYPE_CHECKING:
+    from ._check import Check
+
+
+# Types of global values that are hashed by value.
+LITERALS = (int, float, complex, str, bytes, bool, type(None))
+# Config options that affect what is measured.
+CONFIG_FIELDS = (
+    'opcodes',
+    'opnames',
+    'allocations',
+    'incremental_allocations',
+    'precision',
+    'calibrate',
+    'threads',
+    'hot_lines',
+    'counters',
+    'memory',
+)
+
+
+def _hash_code(code: CodeType, hasher) -> None:
+    """Hash what the code does but not where it is defined.
+
+    Line numbers are not included, so moving the function
+    in the file doesn't invalidate the cache.
+    """
+    hasher.update(code.co_code)
+    hasher.update(repr((code.co_names, code.co_varnames, code.co_freevars)).encode())
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            _hash_code(const, hasher)
+        elif isinstance(const, frozenset):
+            # the order of items in sets depends on the hash seed
+            hasher.update(repr(sorted(repr(item) for item in const)).encode())
+        else:
+            hasher.update(repr(const).encode())
+
+
+def _get_names(code: CodeType) -> Iterator[str]:
+    """Global names used by the code and all nested code objects.
+    """
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _get_names(const)
+
+
+def _hash_value(value: object, hasher, files: set[str], seen: set[int]) -> None:
+    """Hash a value captured by the function, like a default or a closure variable.
+
+    Callables are hashed by their code, tuples item by item,
+    and anything else by its repr.
+    """
+    if isinstance(value, tuple):
+        for item in value:
+            _hash_value(item, hasher, files=files, seen=seen)
+        return
+    if callable(value) and not isinstance(value, type):
+        _hash_callable(value, hasher, files=files, seen=seen)
+        return
+    try:
+        text = repr(value)
+    except Exception:
+        text = type(value).__qualname__
+    hasher.update(text.encode())
+
+
+def _hash_func(func: FunctionType, hasher, files: set[str], seen: set[int]) -> None:
+    """Hash the function and everything it refers to.
+
+    Functions it calls are hashed recursively. For modules and objects
+    defined in other modules, the module source is hashed. For anything else
+    defined next to the function, the whole file is hashed.
+    Default values of arguments and values of closure variables are hashed too.
+    """
+    if id(func) in seen:
+        return
+    seen.add(id(func))
+    code = func.__code__
+    _hash_code(code, hasher)
+    _hash_value(func.__defaults__, hasher, files=files, seen=seen)
+    kwdefaults = tuple(sorted((func.__kwdefaults__ or {}).items()))
+    _hash_value(kwdefaults, hasher, files=files, seen=seen)
+    for name, cell in zip(code.co_freevars, func.__closure__ or ()):
+        try:
+            value = cell.cell_contents
+        except ValueError:
+            # the variable isn't assigned yet
+            hasher.update(name.encode())
+            continue
+        _hash_value((name, value), hasher, files=files, seen=seen)
+    for name in sorted(set(_get_names(code))):
+        if name not in func.__globals__:
+            continue
+        value = func.__globals__[name]
+        if isinstance(value, (FunctionType, partial)):
+            _hash_callable(value, hasher, files=files, seen=seen)
+            continue
+        if isinstance(value, LITERALS):
+            hasher.update(repr((name, value)).encode())
+            continue
+        if isinstance(value, ModuleType):
+            module: ModuleType | None = value
+        else:
+            module_name = getattr(value, '__module__', None)
+            module = sys.modules.get(module_name or '')
+        if module is builtins and getattr(builtins, name, None) is value:
+            continue
+        path = getattr(module, '__file__', None)
+        if path is None:
+            if isinstance(value, ModuleType):
+                continue
+            path = code.co_filename
+        files.add(path)
+
+
+def _hash_callable(func: Callable, hasher, files: set[str], seen: set[int]) -> None:
+    """Hash a function, partial, or any other callable.
+    """
+    if isinstance(func, FunctionType):
+        _hash_func(func, hasher, files=files, seen=seen)
+        return
+    if isinstance(func, partial):
+        _hash_callable(func.func, hasher, files=files, seen=seen)
+        for arg in (*func.args, *func.keywords.items()):
+            if callable(arg):
+                _hash_callable(arg, hasher, files=files, seen=seen)
+            else:
+                hasher.update(repr(arg).encode())
+        return
+    module = getattr(func, '__module__', None)
+    name = getattr(func, '__qualname__', None) or type(func).__qualname__
+    hasher.update(f'{module}.{name}'.encode())
+
+
+def get_key(check: Check, config: Config, group: str = '') -> str:
+    """The hash of everything that can affect results of the check.
+
+    It includes the code of the benchmarking function (but not line numbers),
+    sources of modules it depends on, the interpreter version,
+    parameters of the check, and config options affecting what is measured.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(sys.version.encode())
+    hasher.update(platform.python_implementation().encode())
+    hasher.update(repr((group, check.name)).encode())
+    files: set[str] = set()
+    for field in dataclasses.fields(check):
+        value = getattr(check, field.name)
+        hasher.update(field.name.encode())
+        if callable(value):
+            _hash_callable(value, hasher, files=files, seen=set())
+            continue
+        if field.name == 'args':
+            _hash_value(value, hasher, files=files, seen=set())
+            continue
+        hasher.update(repr(value).encode())
+    for name in CONFIG_FIELDS:
+        hasher.update(repr((name, getattr(config, name))).encode())
+    for path in sorted(files):
+        try:
+            hasher.update(Path(path).read_bytes())
+        except OSError:
+            hasher.update(path.encode())
+    return hasher.hexdigest()
+
+
+def get_loops_key(check: Check) -> str:
+    """The key to cache the calibrated number of loops for the check.
+
+    The code isn't included: the cached value is only the starting point
+    for the calibration, so it's fine if it's outdated.
+    """
+    func = check.func
+    name = getattr(func, '__qualname__', None) or type(func).__qualname__
+    parts = (getattr(func, '__module__', None), name, check.name, check.args)
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def load_loops(cache_dir: Path, key: str) -> int | None:
+    """Load the number of loops calibrated for the check on a previous run.
+    """
+    try:
+        return int((cache_dir / key).read_text(encoding='utf8'))
+    except (OSError, ValueError):
+        return None
+
+
+def save_loops(cache_dir: Path, key: str, loops: int) -> None:
+    """Store the calibrated number of loops for the check.
+    """
+    write_atomic(cache_dir / key, str(loops).encode())
+
+
+def load_report(cache_dir: Path, key: str) -> Report | None:
+    """Load the report stored for the key, if any.
+    """
+    path = cache_dir / f'{key}.json'
+    try:
+        data = json.loads(path.read_text(encoding='utf8'))
+    except (OSError, ValueError):
+        return None
+    try:
+        return Report.from_dict(data)
+    except (KeyError, TypeError):
+        return None
+
+
+def save_report(cache_dir: Path, key: str, report: Report) -> None:
+    """Store the report so that it can be reused on the next run.
+    """
+    path = cache_dir / f'{key}.json'
+    write_atomic(path, json.dumps(report.to_dict()).encode())
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import gc
+from dataclasses import dataclass
+from functools import lru_cache
+from statistics import median
+from typing import AsyncIterable, Iterable
+
+from ._aio import get_loop
+from ._loopers import EachLooper, Timer, TotalLooper
+
+
+CALIBRATION_LOOPS = 10_000
+CALIBRATION_REPEATS = 20
+
+
+@dataclass(frozen=True)
+class Overhead:
+    """The cost of measuring an empty loop on the current machine.
+    """
+    # The time per loop spent by TotalLooper itself.
+    total: float
+    # The time per loop spent by EachLooper itself.
+    each: float
+    # The variation of the overhead which cannot be subtracted.
+    floor: float
+
+
+def _empty(r: Iterable[int]) -> None:
+    for _ in r:
+        pass
+
+
+async def _aempty(r: AsyncIterable[int]) -> None:
+    async for _ in r:
+        pass
+
+
+def _measure(timer: Timer, asynchronous: bool) -> Overhead:
+    def run(looper) -> None:
+        if asynchronous:
+            get_loop().run_until_complete(_aempty(looper))
+        else:
+            _empty(looper)
+
+    per_loop = []
+    for _ in range(CALIBRATION_REPEATS):
+        tlooper = TotalLooper(loops=CALIBRATION_LOOPS, timer=timer)
+        run(tlooper)
+        per_loop.append((tlooper.stop - tlooper.start) / CALIBRATION_LOOPS)
+    elooper = EachLooper(loops=CALIBRATION_LOOPS, timer=timer, timings=[])
+    run(elooper)
+
+    # The smallest overhead is subtracted, so the typical error
+    # is how far the median is from it.
+    return Overhead(
+        total=min(per_loop),
+        each=min(elooper.timings),
+        floor=median(per_loop) - min(per_loop),
+    )
+
+
+@lru_cache(maxsize=None)
+def get_overhead(timer: Timer, asynchronous: bool = False) -> Overhead:
+    """Measure the overhead of loopers for the given timer.
+
+    If `asynchronous` is True, measure the overhead of `async for`.
+
+    The result is cached, so the calibration runs only once per process
+    for each timer.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _measure(timer, asynchronous=asynchronous)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
@@ -1,18 +1,115 @@
 from __future__ import annotations
 
 import gc
-from dataclasses import dataclass
-from typing import Callable, Iterable
+import inspect
+import itertools
+import math
+import threading
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, replace
+from pathlib import Path
+from time import perf_counter
+from typing import (
+    Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, NamedTuple,
+    Optional, Union,
+)
 
+from ._aio import Intervals, close_loop, get_idle, run
+from ._cache import (
+    get_key, get_loops_key, load_loops, load_report, save_loops, save_report,
+)
+from ._calibration import get_overhead
 from ._colors import colors
 from ._config import DEFAULT_CONFIG, Config
 from ._loopers import (
-    EachLooper, MemoryLooper, OpcodeLooper, Timer, TotalLooper,
+    EachLooper, LineStats, MemoryLooper, OpcodeLooper, Timer, Timings,
+    TimingsBuffer, TimingsHistogram, TotalLooper,
+)
+from ._perf import Counters
+from ._progress import Progress
+from ._report import Report
+from ._results import (
+    ComplexityResult, LinesResult, MallocResult, MemoryResult, OpcodesResult,
+    ScalingResult, TimingResult,
 )
-from ._results import MallocResult, OpcodesResult, TimingResult
+from ._rusage import get_max_rss
+from ._stats import relative_ci
+
+
+SyncFunc = Callable[[Iterable[int]], None]
+AsyncFunc = Callable[[AsyncIterable[int]], Awaitable[None]]
+Func = Union[SyncFunc, AsyncFunc]
+# The max number of bars in histograms.
+HISTOGRAM_LIMIT = 64
+# Probe runs are extrapolated when they take at least that fraction of min_time.
+MIN_PROBE = .01
+# Aim a bit above min_time, so that the noise doesn't make the run too short.
+CALIBRATION_MARGIN = 1.2
+# A calibration run taking up to that many min_times is used as a repeat.
+MAX_OVERSHOOT = 3
+# Before the calibration, up to that many first loops are timed individually
+# (but for no longer than min_time), so that the warmup can be detected.
+WARMUP_LOOPS = 10_000
+
+
+class Repeat(NamedTuple):
+    """Measurements of a single repeat (benchmarking function call).
+    """
+    # The total time of all loops.
+    total: float
+    # How long async benchmark was suspended, waiting for the event loop.
+    idle: float = 0
+    # Values of hardware counters for all loops, if enabled.
+    counts: Optional[Dict[str, int]] = None
+    # Resource usage (CPU time, page faults, context switches) of all loops.
+    usage: Optional[Dict[str, float]] = None
+
+    @property
+    def busy(self) -> float:
+        """The time spent on running the benchmark itself.
+        """
+        return self.total - self.idle
+
+
+def _set_base(
+    report: Report,
+    base: Report | None,
+    base_time: float | None,
+) -> None:
+    """Set the baseline to compare the results with.
+    """
+    tresult = report.timing
+    if base is not None:
+        tresult._comparison = tresult.compare(base.timing)
+        if base_time is None:
+            base_time = base.timing.best
+        if report.opcodes is not None:
+            report.opcodes._base = base.opcodes
+    tresult._base_time = base_time
+
 
+def show_report(
+    report: Report,
+    config: Config,
+    base: Report | None = None,
+    base_time: float | None = None,
+    note: str = '',
+) -> None:
+    """Print and record the report that was measured earlier or elsewhere.
 
-Func = Callable[[Iterable[int]], None]
+    The `note` is shown next to the check name, like "(cached)".
+    """
+    title = colors.magenta(report.check)
+    if note:
+        title += f' {colors.yellow(f"({note})")}'
+    print(f'  {title}', file=config.stream)
+    _set_base(report, base=base, base_time=base_time)
+    report.print(stream=config.stream, histogram_lines=config.histogram_lines)
+    if config.output is not None:
+        report.write(config.output)
+    if config.history is not None:
+        config.history.add(report)
 
 
 @dataclass(frozen=True)
@@ -27,109 +124,615 @@ class Check:
     repeats: int
     min_time: float
     timer: Timer
+    precision: float | None = None
+    max_repeats: int = 100
+    max_time: float = 10.
+    # Input sizes to run the benchmark with, passed as the second argument.
+    sizes: tuple[int, ...] = ()
+    # Extra arguments to pass into the benchmarking function.
+    args: tuple[Any, ...] = ()
+    # Called with `args` before each repeat, the result is yielded by the looper.
+    setup: Callable[..., Any] | None = None
+    # Called with each value produced by `setup` after the repeat.
+    teardown: Callable[[Any], Any] | None = None
+    # Call `setup` for each iteration instead of each repeat.
+    per_iteration: bool = False
 
     def print(
         self,
         config: Config = DEFAULT_CONFIG,
         base_time: float | None = None,
+        group: str = '',
+        base: TimingResult | None = None,
     ) -> TimingResult:
+        """Run all benchmarks for the check and print the results.
+
+        If `base` is specified, the timing is compared with it,
+        including the statistical significance of the difference.
+        """
+        base_report = None
+        if base is not None:
+            base_report = Report(group=group, check='', timing=base)
+        report = self.print_report(
+            config=config,
+            base_time=base_time,
+            group=group,
+            base=base_report,
+        )
+        return report.timing
+
+    def print_report(
+        self,
+        config: Config = DEFAULT_CONFIG,
+        base_time: float | None = None,
+        group: str = '',
+        base: Report | None = None,
+    ) -> Report:
+        """Run all benchmarks for the check, print and return all results.
+
+        If `base` is specified, the results are compared with it,
+        including the statistical significance of the timing difference
+        and the difference in executed instructions.
+
+        If the check has `sizes`, the timing is measured for each size
+        and all other benchmarks run only for the largest size.
+
+        If `config.results_cache` is specified, the results stored there
+        are reused when neither the check nor its dependencies changed.
+        """
         print_args: dict = dict(
             stream=config.stream,
             histogram_lines=config.histogram_lines,
         )
+        key = None
+        if config.results_cache is not None:
+            key = get_key(self, config=config, group=group)
+            cached = None
+            if not config.force:
+                cached = load_report(config.results_cache, key)
+            if cached is not None:
+                show_report(
+                    cached,
+                    config=config,
+                    base=base,
+                    base_time=base_time,
+                    note='cached',
+                )
+                return cached
+
         print(f'  {colors.magenta(self.name)}', file=config.stream)
-        tresult = self.check_timing()
-        tresult._base_time = base_time
-        tresult.print(**print_args)
-        if config.allocations or config.opcodes:
-            oresult = self.check_opcodes(best=tresult.best)
+        progress = config.progress
+        if progress is None:
+            progress = Progress()
+        progress.start(group=group, check=self.name)
+        precision = self.precision
+        if precision is None:
+            precision = config.precision
+        counters = None
+        if config.counters:
+            try:
+                counters = Counters()
+            except OSError as exc:
+                warn = colors.yellow('hardware counters are not available')
+                print(f'    {warn}: {exc}', file=config.stream)
+        check = self
+        cresult = None
+        try:
+            if self.sizes:
+                cresult = self.check_complexity(
+                    precision=precision,
+                    calibrate=config.calibrate,
+                    counters=counters,
+                    loops_cache=config.loops_cache,
+                    progress=progress,
+                )
+                tresult = cresult.timings[-1]
+                check = self.with_size(self.sizes[-1])
+            else:
+                tresult = self.check_timing(
+                    precision=precision,
+                    calibrate=config.calibrate,
+                    counters=counters,
+                    loops_cache=config.loops_cache,
+                    progress=progress,
+                )
+        finally:
+            if counters is not None:
+                counters.close()
+            progress.clear()
+        report = Report(group=group, check=self.name, timing=tresult)
+        _set_base(report, base=base, base_time=base_time)
+        if cresult is None:
+            tresult.print(**print_args)
+        else:
+            cresult.print(**print_args)
+            report.complexity = cresult
+        if config.memory:
+            with progress.phase('memory'):
+                memresult = check.check_memory(repeats=self.repeats)
+            memresult.print(**print_args)
+            report.memory = memresult
+        if config.allocations or config.opcodes or config.opnames:
+            with progress.phase('opcodes'):
+                oresult = check.check_opcodes(
+                    best=tresult.best,
+                    buckets=HISTOGRAM_LIMIT,
+                    opnames=config.opnames,
+                )
+            if base is not None:
+                oresult._base = base.opcodes
             oresult.print(**print_args)
+            report.opcodes = oresult
         if config.allocations:
-            mresult = self.check_mallocs(lines=oresult.lines)
+            with progress.phase('allocations'):
+                mresult = check.check_mallocs(
+                    lines=oresult.lines,
+                    incremental=config.incremental_allocations,
+                )
             mresult.print(**print_args)
-        return tresult
+            report.mallocs = mresult
+        if config.threads > 1:
+            base_time = tresult.best
+            if tresult.event_loop_timings:
+                # Threads are timed including the time spent in the event loop.
+                base_time = min(map(sum, zip(
+                    tresult.total_timings,
+                    tresult.event_loop_timings,
+                )))
+            with progress.phase('threads'):
+                sresult = check.check_threads(
+                    max_threads=config.threads,
+                    loops=len(tresult.loop_timings),
+                    base=base_time,
+                )
+            sresult.print(**print_args)
+            report.scaling = sresult
+        if config.hot_lines:
+            with progress.phase('hot lines'):
+                lresult = check.check_lines(top=config.hot_lines)
+            lresult.print(**print_args)
+            report.hot_lines = lresult
+        if key is not None:
+            assert config.results_cache is not None
+            save_report(config.results_cache, key, report)
+        if config.output is not None:
+            report.write(config.output)
+        if config.history is not None:
+            config.history.add(report)
+        return report
 
-    def check_timing(self) -> TimingResult:
+    def check_timing(
+        self,
+        precision: float | None = None,
+        calibrate: bool = False,
+        counters: Counters | None = None,
+        loops_cache: Path | None = None,
+        progress: Progress | None = None,
+    ) -> TimingResult:
         """Run benchmarks for the check.
+
+        If `precision` is specified, keep running repeats until the relative
+        confidence interval gets below it or max_repeats or max_time is reached.
+        If not specified, the `precision` of the check is used.
+
+        If `calibrate` is True, the overhead of loopers is measured
+        and subtracted from the results.
+
+        If `counters` are specified, hardware counters are recorded
+        for each repeat.
+
+        If `loops_cache` is specified, the number of loops calibrated
+        on the previous run is stored there and used to start the calibration.
+
+        If `progress` is specified, it's updated between repeats,
+        with the ETA based on the calibrated number of loops.
         """
-        # to detect caching, we should individually record
-        # the very first run
-        each_timings = self._run_each_loop(2)
-        total_timings = []
+        if precision is None:
+            precision = self.precision
+        if progress is None:
+            progress = Progress()
+        started = perf_counter()
+        # To detect caching and the warmup, the very first loops must be
+        # timed individually, in one run and before anything else.
+        # With per-iteration setup, all items are generated in advance,
+        # so the number of loops is limited by what the last run needed.
         loops = self.loops
+        if loops is not None:
+            each_timings = self._run_each_loop(max(2, loops))
+        else:
+            warmup_loops = WARMUP_LOOPS
+            if self.per_iteration and self.setup is not None:
+                warmup_loops = 2
+                if loops_cache is not None:
+                    warmup_loops = load_loops(loops_cache, get_loops_key(self)) or 2
+            each_timings = self._run_each_loop(
+                max(2, min(warmup_loops, WARMUP_LOOPS)),
+                max_time=self.min_time,
+            )
+        warmup_loops = len(each_timings)
+        measurements: list[Repeat] = []
         repeats = self.repeats
+        estimate = None
         if loops is None:
-            loops, raw_timing = self._autorange()
-            total_timings.append(raw_timing)
+            progress.phase('calibration')
+            start = 1
+            if loops_cache is not None:
+                key = get_loops_key(self)
+                start = load_loops(loops_cache, key) or 1
+            loops, first_repeat = self._autorange(start=start, counters=counters)
+            if loops_cache is not None and loops != start:
+                save_loops(loops_cache, key, loops)
+            measurements.append(first_repeat)
             repeats -= 1
-        if loops > 2:
-            each_timings.extend(self._run_each_loop(loops - 2))
+            estimate = first_repeat.total
+        if loops > len(each_timings):
+            progress.phase('iterations')
+            each_timings.extend(self._run_each_loop(loops - len(each_timings)))
 
+        progress.phase('repeats', total=repeats, estimate=estimate)
         for _ in range(repeats):
-            total_timings.append(self._run_total_loop(loops))
-        assert len(total_timings) == self.repeats
+            measurements.append(self._run_total_loop(loops, counters=counters))
+            progress.step()
+        if precision is not None:
+            progress.phase(
+                'precision',
+                total=self.max_repeats - len(measurements),
+                estimate=measurements[-1].total,
+                deadline=started + self.max_time,
+            )
+            while len(measurements) < self.max_repeats:
+                if relative_ci([m.busy for m in measurements]) <= precision:
+                    break
+                if perf_counter() - started >= self.max_time:
+                    break
+                measurements.append(self._run_total_loop(loops, counters=counters))
+                progress.step()
+        assert len(measurements) >= self.repeats
+        event_loop_timings = None
+        if self.is_async:
+            event_loop_timings = [m.idle / loops for m in measurements]
+        counts = None
+        if counters is not None:
+            counts = [
+                {name: value / loops for name, value in (m.counts or {}).items()}
+                for m in measurements
+            ]
+        usage = [m.usage for m in measurements if m.usage]
+        overhead = None
+        if calibrate:
+            overhead = get_overhead(self.timer, asynchronous=self.is_async)
         return TimingResult(
-            total_timings=[dt / loops for dt in total_timings],
+            total_timings=[m.busy / loops for m in measurements],
             each_timings=each_timings,
+            warmup_loops=warmup_loops,
+            overhead=overhead,
+            event_loop_timings=event_loop_timings,
+            counters=counts,
+            usage=usage if len(usage) == len(measurements) else None,
         )
 
-    def check_opcodes(self, loops: int = 1, best: float = 0) -> OpcodesResult:
+    def check_complexity(
+        self,
+        precision: float | None = None,
+        calibrate: bool = False,
+        counters: Counters | None = None,
+        loops_cache: Path | None = None,
+        progress: Progress | None = None,
+    ) -> ComplexityResult:
+        """Run benchmarks for each input size and detect the complexity.
+        """
+        timings = []
+        for size in self.sizes:
+            check = self.with_size(size)
+            timings.append(check.check_timing(
+                precision=precision,
+                calibrate=calibrate,
+                counters=counters,
+                loops_cache=loops_cache,
+                progress=progress,
+            ))
+        return ComplexityResult(sizes=list(self.sizes), timings=timings)
+
+    def with_size(self, size: int) -> Check:
+        """The same check but running only for the given input size.
+        """
+        return replace(self, sizes=(), args=(size,) + self.args)
+
+    def check_opcodes(
+        self,
+        loops: int = 1,
+        best: float = 0,
+        buckets: int | None = None,
+        opnames: bool = False,
+    ) -> OpcodesResult:
         """Run the benchmark and count executed opcodes.
+
+        If `buckets` is specified, only that many buckets of aggregated
+        opcode durations are stored instead of timestamps for each opcode.
+        It's enough to draw a histogram and takes a fixed amount of memory.
+
+        If `opnames` is True, executed instructions are counted by name.
         """
-        looper = OpcodeLooper(loops=loops)
+        timings: Timings
+        if buckets is None:
+            timings = TimingsBuffer()
+        else:
+            timings = TimingsHistogram(buckets=buckets)
+        looper = OpcodeLooper(
+            loops=loops,
+            timings=timings,
+            opnames=Counter() if opnames else None,
+        )
         self._run(looper)
         return OpcodesResult(
             opcodes=looper.opcodes,
             lines=looper.lines,
             timings=looper.timings,
             best=best,
+            opnames=looper.opnames,
         )
 
-    def check_mallocs(self, lines: int, loops: int = 1) -> MallocResult:
+    def check_memory(self, loops: int = 1, repeats: int = 5) -> MemoryResult:
+        """Run the benchmark and measure how much memory it takes.
+
+        Only the total memory traced by tracemalloc is read before and after
+        each repeat, without tracing each line, so it's almost as fast
+        as running the benchmark. The peak RSS growth is measured
+        on a separate run without tracemalloc, which has its own overhead.
+        """
+        rss_before = get_max_rss()
+        self._run(TotalLooper(loops=loops, timer=self.timer))
+        rss = None
+        if rss_before is not None:
+            rss_after = get_max_rss()
+            assert rss_after is not None
+            rss = rss_after - rss_before
+
+        peaks = []
+        nets = []
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        try:
+            for _ in range(repeats):
+                # The net memory is counted from before the setup,
+                # so that the values it creates and then frees are not included.
+                before = tracemalloc.get_traced_memory()[0]
+                start = before
+
+                def ready() -> None:
+                    nonlocal before, start
+                    if hasattr(tracemalloc, 'reset_peak'):
+                        tracemalloc.reset_peak()
+                    else:
+                        # python 3.8: restart tracing to reset the peak
+                        tracemalloc.stop()
+                        tracemalloc.start()
+                        before = 0
+                    start = tracemalloc.get_traced_memory()[0]
+
+                self._run(TotalLooper(loops=loops, timer=self.timer), ready=ready)
+                current, peak = tracemalloc.get_traced_memory()
+                peaks.append(peak - start)
+                nets.append(current - before)
+        finally:
+            if not was_tracing:
+                tracemalloc.stop()
+        return MemoryResult(peaks=peaks, nets=nets, rss=rss)
+
+    def check_lines(self, loops: int = 1, top: int = 10) -> LinesResult:
+        """Run the benchmark and measure how long each line of code takes.
+
+        Only `top` slowest lines are shown but all of them are recorded.
+        """
+        line_stats: LineStats = {}
+        looper = OpcodeLooper(
+            loops=loops,
+            timings=TimingsHistogram(buckets=1),
+            line_stats=line_stats,
+        )
+        self._run(looper)
+        return LinesResult(stats=line_stats, top=top)
+
+    def check_mallocs(
+        self,
+        lines: int,
+        loops: int = 1,
+        incremental: bool = False,
+    ) -> MallocResult:
         """Run the benchmark and trace memory allocations.
+
+        The incremental mode is much faster when the benchmark holds
+        a lot of memory but allocations in each file are sampled less often.
         """
         period = max(1, round(lines / 500))
-        looper = MemoryLooper(period=period, loops=loops)
-        self.func(looper)
+        looper = MemoryLooper(period=period, loops=loops, incremental=incremental)
+        self._call(looper)
         return MallocResult(
             totals=looper.totals,
             allocs=looper.allocs,
         )
 
+    def check_threads(
+        self,
+        max_threads: int,
+        loops: int = 1,
+        base: float | None = None,
+    ) -> ScalingResult:
+        """Run the benchmark concurrently in 1, 2, 4... max_threads threads.
+
+        All threads start running loops at the same time.
+        The `base` is the time per loop when running in a single thread,
+        used to calculate the scaling efficiency. If not specified,
+        the result of the single-thread run is used.
+        """
+        threads_counts = []
+        threads = 1
+        while threads < max_threads:
+            threads_counts.append(threads)
+            threads *= 2
+        threads_counts.append(max_threads)
+
+        walls = []
+        latencies = []
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for threads in threads_counts:
+                loopers = self._run_threads(threads=threads, loops=loops)
+                start = min(looper.start for looper in loopers)
+                stop = max(looper.stop for looper in loopers)
+                walls.append(stop - start)
+                latencies.append([(lp.stop - lp.start) / loops for lp in loopers])
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if base is None:
+            base = latencies[0][0]
+        return ScalingResult(
+            threads=threads_counts,
+            walls=walls,
+            latencies=latencies,
+            loops=loops,
+            base=base,
+        )
+
+    @property
+    def is_async(self) -> bool:
+        """True if the benchmarking function is async.
+        """
+        return inspect.iscoroutinefunction(self.func)
+
     # Private methods
 
-    def _run_total_loop(self, loops: int = 1) -> float:
-        looper = TotalLooper(loops=loops, timer=self.timer)
-        self._run(looper)
-        return looper.stop - looper.start
+    def _run_total_loop(
+        self,
+        loops: int = 1,
+        counters: Counters | None = None,
+    ) -> Repeat:
+        looper = TotalLooper(loops=loops, timer=self.timer, counters=counters)
+        intervals = self._run(looper)
+        return Repeat(
+            total=looper.stop - looper.start,
+            idle=get_idle(intervals, start=looper.start, stop=looper.stop),
+            counts=looper.counts if counters is not None else None,
+            usage=looper.usage or None,
+        )
 
-    def _run_each_loop(self, loops: int) -> list[float]:
-        looper = EachLooper(loops=loops, timer=self.timer, timings=[])
+    def _run_each_loop(
+        self,
+        loops: int,
+        max_time: float | None = None,
+    ) -> list[float]:
+        looper = EachLooper(
+            loops=loops,
+            timer=self.timer,
+            timings=[],
+            max_time=max_time,
+        )
         self._run(looper)
-        assert len(looper.timings) == loops
+        if max_time is None:
+            assert len(looper.timings) == loops
         return looper.timings
 
-    def _run(self, looper: Iterable[int]) -> None:
+    def _run_threads(self, threads: int, loops: int) -> list[TotalLooper]:
+        """Run the benchmark in the given number of threads at the same time.
+        """
+        barrier = threading.Barrier(threads)
+        loopers = [TotalLooper(loops=loops, timer=self.timer) for _ in range(threads)]
+
+        def worker(looper: TotalLooper) -> None:
+            try:
+                self._call(looper, ready=barrier.wait)
+            finally:
+                close_loop()
+
+        workers = [threading.Thread(target=worker, args=(lp,)) for lp in loopers]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return loopers
+
+    def _run(
+        self,
+        looper: Iterable[int],
+        ready: Callable[[], Any] | None = None,
+    ) -> Intervals:
         gc_was_enabled = gc.isenabled()
         gc.disable()
         try:
-            self.func(looper)
+            return self._call(looper, ready=ready)
         finally:
             if gc_was_enabled:
                 gc.enable()
 
-    def _autorange(self) -> tuple[int, float]:
+    def _call(
+        self,
+        looper,
+        ready: Callable[[], Any] | None = None,
+    ) -> Intervals:
+        """Call the benchmarking function.
+
+        Async functions are executed in the event loop. In that case,
+        the intervals when the function was suspended are returned.
+
+        The setup is called before the looper starts the timer, and all items
+        for the per-iteration setup are generated in advance. If `ready`
+        is specified, it is called after the setup, right before the benchmark.
+        """
+        values = self._setup(looper.loops)
+        if values is not None:
+            if self.per_iteration:
+                looper.items = values
+            else:
+                looper.items = itertools.repeat(values[0], looper.loops)
+        if ready is not None:
+            ready()
+        try:
+            result = self.func(looper, *self.args)
+            if inspect.iscoroutine(result):
+                return run(result, timer=self.timer)
+            return []
+        finally:
+            if values is not None and self.teardown is not None:
+                for value in values:
+                    self.teardown(value)
+
+    def _setup(self, loops: int) -> list[Any] | None:
+        """Produce values for the looper using the setup function, if any.
+        """
+        if self.setup is None:
+            return None
+        if self.per_iteration:
+            return [self.setup(*self.args) for _ in range(loops)]
+        return [self.setup(*self.args)]
+
+    def _autorange(
+        self,
+        start: int = 1,
+        counters: Counters | None = None,
+    ) -> tuple[int, Repeat]:
         """Return the number of loops so that total time is at least min_time.
 
-        Calls the timeit method with increasing numbers from the sequence
-        1, 2, 5, 10, 20, 50, ... until the time taken is at least 0.2
-        second.
+        Probes with 1, 10, 100... loops until a probe is long enough
+        to estimate the time of a single loop, and then extrapolates
+        straight to the number of loops that takes min_time.
+        The last run is returned to be used as the first repeat.
+
+        If `start` is specified (calibrated on a previous run), it is
+        tried first, and the calibration is done again only if the time
+        it takes is too far from min_time.
         """
-        i = 1
+        loops = max(1, start)
         while True:
-            for j in 1, 2, 5:
-                number = i * j
-                time_taken = self._run_total_loop(number)
-                if time_taken >= self.min_time:
-                    return number, time_taken
-            i *= 10
+            repeat = self._run_total_loop(loops, counters=counters)
+            total = repeat.total
+            if total >= self.min_time:
+                if loops == 1 or total <= self.min_time * MAX_OVERSHOOT:
+                    return loops, repeat
+            if total >= self.min_time * MIN_PROBE:
+                target = self.min_time * CALIBRATION_MARGIN / total
+                loops = max(1, math.ceil(loops * target))
+            else:
+                loops *= 10
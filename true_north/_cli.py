@@ -1,14 +1,24 @@
 from __future__ import annotations
 
 import argparse
+import multiprocessing
 import sys
 from argparse import ArgumentParser
+from importlib.util import find_spec
 from pathlib import Path
 from typing import Iterator, NoReturn, TextIO
 
-from ._colors import disable_colors
+from ._aio import use_uvloop
+from ._colors import colors, disable_colors
 from ._config import Config
+from ._discovery import CACHE_DIR, Index, load_code
+from ._environment import get_fingerprint
 from ._group import Group
+from ._history import HISTORY_PATH, METRICS, History, print_history
+from ._isolation import MODES, run_isolated
+from ._parallel import run_parallel
+from ._progress import Progress
+from ._system import check_system, pin, print_system_warnings, raise_priority
 
 
 try:
@@ -34,38 +44,168 @@ def get_paths(path: Path) -> Iterator[Path]:
         yield from get_paths(subpath)
 
 
-def run_all_groups(path: Path, args: argparse.Namespace, stdout: TextIO) -> None:
-    content = path.read_text()
+def run_all_groups(
+    path: Path,
+    args: argparse.Namespace,
+    stdout: TextIO,
+    output: TextIO | None = None,
+) -> None:
     globals: dict[str, object] = {}
-    code = compile(content, filename=str(path), mode='exec')
+    cache_dir = None if args.no_cache else args.cache_dir
+    code = load_code(path, cache_dir=cache_dir)
     exec(code, globals)
     if args.no_color:
         disable_colors()
-    for group in globals.values():
-        if not isinstance(group, Group):
-            continue
-        if args.groups and group.name not in args.groups:
-            continue
-        config = Config(
+    if args.uvloop:
+        use_uvloop()
+    results_cache = None
+    if args.cache_results:
+        results_cache = args.cache_dir / 'results'
+    loops_cache = None
+    if not args.no_cache:
+        loops_cache = args.cache_dir / 'loops'
+    history = None
+    if args.history is not None:
+        history = History(args.history, run=args.history_run)
+    config = Config(
+        stream=stdout,
+        opcodes=args.opcodes,
+        opnames=args.opnames,
+        allocations=args.allocations,
+        incremental_allocations=args.incremental_allocations,
+        histogram_lines=args.histogram_lines,
+        output=output,
+        precision=args.precision,
+        calibrate=args.calibrate,
+        threads=args.threads,
+        hot_lines=args.hot_lines,
+        counters=args.counters,
+        memory=args.memory,
+        results_cache=results_cache,
+        force=args.force,
+        loops_cache=loops_cache,
+        history=history,
+        progress=Progress(sys.stderr) if args.progress else None,
+    )
+    try:
+        for group in globals.values():
+            if not isinstance(group, Group):
+                continue
+            if args.groups and group.name not in args.groups:
+                continue
+            if args.isolate:
+                run_isolated(
+                    group,
+                    config=config,
+                    path=path,
+                    mode=args.isolate,
+                    warm_fork=args.warm_fork,
+                    cache_dir=cache_dir,
+                    uvloop=args.uvloop,
+                )
+                continue
+            group.print(config=config)
+    finally:
+        if history is not None:
+            history.close()
+
+
+def main_history(argv: list[str], stdout: TextIO) -> int:
+    """Show how checks changed across runs recorded with `--history`.
+    """
+    parser = ArgumentParser(prog='true-north history')
+    parser.add_argument(
+        'path', type=Path, nargs='?', default=HISTORY_PATH,
+        help='The history database.'
+    )
+    parser.add_argument(
+        '--group', dest='groups', nargs='*',
+        help='The group name to show. Can specify multiple values.'
+    )
+    parser.add_argument(
+        '--metric', choices=sorted(METRICS), default='time',
+        help='What to show: the best time, opcodes, allocations, or peak memory.'
+    )
+    parser.add_argument(
+        '--limit', type=int, default=64,
+        help='How many latest runs to show.'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=.1,
+        help='How much (as a fraction) a check must be slower to be a regression.'
+    )
+    parser.add_argument(
+        '--all-machines', action='store_true',
+        help='Show results recorded on all machines, not only the current one.'
+    )
+    parser.add_argument(
+        '--no-color', action='store_true',
+        help='Write a boring one-color output.'
+    )
+    args = parser.parse_args(argv)
+    if not args.path.exists():
+        parser.error(f'{args.path} does not exist')
+    if args.no_color:
+        disable_colors()
+    with History(args.path) as history:
+        print_history(
+            history,
             stream=stdout,
-            opcodes=args.opcodes,
-            allocations=args.allocations,
-            histogram_lines=args.histogram_lines,
+            metric=args.metric,
+            groups=args.groups or (),
+            fingerprint=None if args.all_machines else get_fingerprint(),
+            limit=args.limit,
+            threshold=args.threshold,
         )
-        group.print(config=config)
+    return 0
+
+
+def main_check_system(argv: list[str], stdout: TextIO) -> int:
+    """Show system settings that can make benchmarks noisy.
+
+    The exit code is 1 if any of them does.
+    """
+    parser = ArgumentParser(prog='true-north check-system')
+    parser.add_argument(
+        '--no-color', action='store_true',
+        help='Write a boring one-color output.'
+    )
+    args = parser.parse_args(argv)
+    if args.no_color:
+        disable_colors()
+    checks = check_system()
+    for check in checks:
+        print(check.format_text(), file=stdout)
+    return 1 if any(check.ok is False for check in checks) else 0
 
 
 def main(argv: list[str], stdout: TextIO) -> int:
+    if argv[:1] == ['history']:
+        return main_history(argv[1:], stdout=stdout)
+    if argv[:1] == ['check-system']:
+        return main_check_system(argv[1:], stdout=stdout)
     parser = ArgumentParser()
     parser.add_argument('paths', nargs='+')
     parser.add_argument(
         '--opcodes', action='store_true',
         help='Count opcodes. Slow but reproducible.'
     )
+    parser.add_argument(
+        '--opnames', action='store_true',
+        help='Count opcodes by name and show how they differ from the first check.'
+    )
+    parser.add_argument(
+        '--memory', action='store_true',
+        help='Measure peak memory usage. Cheap enough to run every time.'
+    )
     parser.add_argument(
         '--allocations', action='store_true',
         help='Count memory allocations. Slow but fun.'
     )
+    parser.add_argument(
+        '--incremental-allocations', action='store_true',
+        help='Take memory snapshots less often. Use with --allocations for big heaps.'
+    )
     parser.add_argument(
         '--no-color', action='store_true',
         help='Write a boring one-color output.'
@@ -82,11 +222,131 @@ def main(argv: list[str], stdout: TextIO) -> int:
         '--group', dest='groups', nargs='*',
         help='The group name to run. Can specify multiple values.'
     )
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=1,
+        help='How many files to run in parallel, each on its own CPU core.'
+    )
+    parser.add_argument(
+        '--precision', type=float,
+        help='Repeat checks until the confidence interval is within this fraction.'
+    )
+    parser.add_argument(
+        '--calibrate', action='store_true',
+        help='Measure the overhead of the benchmarking loop and subtract it.'
+    )
+    parser.add_argument(
+        '--threads', type=int, default=0,
+        help='Measure how checks scale when running in up to that many threads.'
+    )
+    parser.add_argument(
+        '--hot-lines', type=int, default=0,
+        help='Show that many slowest lines of code. Slow but helps optimizing.'
+    )
+    parser.add_argument(
+        '--counters', action='store_true',
+        help='Count CPU instructions, cycles, and misses using perf events (Linux).'
+    )
+    parser.add_argument(
+        '--isolate', choices=MODES,
+        help='Run each check or each group in a separate worker process.'
+    )
+    parser.add_argument(
+        '--warm-fork', action='store_true',
+        help='Fork isolated workers from the process that already loaded benchmarks.'
+    )
+    parser.add_argument(
+        '--progress', action='store_true',
+        help='Show the check being measured and the ETA in stderr.'
+    )
+    parser.add_argument(
+        '--pin', type=int, nargs='?', const=-1, metavar='CPU',
+        help='Pin the benchmarks to the CPU core. By default, the last isolated one.'
+    )
+    parser.add_argument(
+        '--high-priority', action='store_true',
+        help='Raise the scheduling priority of benchmarks. Usually requires root.'
+    )
+    parser.add_argument(
+        '--uvloop', action='store_true',
+        help='Run async checks using uvloop.'
+    )
+    parser.add_argument(
+        '--output', type=Path,
+        help='Write results of each check into the file as newline-delimited JSON.'
+    )
+    parser.add_argument(
+        '--no-cache', action='store_true',
+        help='Do not cache discovered groups, compiled code, and calibrated loops.'
+    )
+    parser.add_argument(
+        '--cache-dir', type=Path, default=CACHE_DIR,
+        help='The directory where to store the cache.'
+    )
+    parser.add_argument(
+        '--cache-results', action='store_true',
+        help='Reuse results of checks that did not change since the last run.'
+    )
+    parser.add_argument(
+        '--force', action='store_true',
+        help='Run all checks even if their results are cached.'
+    )
+    parser.add_argument(
+        '--history', type=Path, nargs='?', const=HISTORY_PATH,
+        help='Record results into the SQLite database to see trends across commits.'
+    )
     args = parser.parse_args(argv)
+    if args.uvloop and find_spec('uvloop') is None:
+        parser.error('uvloop is not installed')
+    if args.warm_fork:
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            parser.error('--warm-fork is not supported on this platform')
+        if args.isolate is None:
+            args.isolate = 'check'
+    if args.pin is not None and args.jobs > 1:
+        parser.error('--pin cannot be used with --jobs, workers are pinned anyway')
+    if args.progress and args.jobs > 1:
+        parser.error('--progress cannot be used with --jobs')
+    if args.no_color:
+        disable_colors()
+    print_system_warnings(sys.stderr)
+    if args.pin is not None:
+        try:
+            pin(None if args.pin < 0 else args.pin)
+        except OSError as exc:
+            print(colors.yellow(f'cannot pin to a CPU core: {exc}'), file=sys.stderr)
+    if args.high_priority:
+        try:
+            raise_priority()
+        except OSError as exc:
+            print(colors.yellow(f'cannot raise the priority: {exc}'), file=sys.stderr)
+    output: TextIO | None = None
+    if args.output is not None:
+        output = args.output.open('w', encoding='utf8')
     try:
-        for root in args.paths:
-            for path in get_paths(Path(root)):
-                run_all_groups(path, args=args, stdout=stdout)
+        paths = [
+            path
+            for root in args.paths
+            for path in get_paths(Path(root))
+        ]
+        if args.groups and not args.no_cache:
+            # execute only files that define the requested groups
+            index = Index(args.cache_dir)
+            paths = [path for path in paths if index.has_groups(path, args.groups)]
+            index.save()
+        args.history_run = None
+        if args.history is not None:
+            with History(args.history) as history:
+                args.history_run = history.start_run()
+        if args.jobs > 1:
+            for text, records in run_parallel(paths, args=args, jobs=args.jobs):
+                stdout.write(text)
+                stdout.flush()
+                if output is not None:
+                    output.write(records)
+                    output.flush()
+        else:
+            for path in paths:
+                run_all_groups(path, args=args, stdout=stdout, output=output)
     except KeyboardInterrupt:
         print('Interrupted')
         return 1
@@ -94,6 +354,9 @@ def main(argv: list[str], stdout: TextIO) -> int:
         if args.pdb:
             pdb.post_mortem()
         raise
+    finally:
+        if output is not None:
+            output.close()
     return 0
 
 
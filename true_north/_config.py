@@ -2,15 +2,35 @@ from __future__ import annotations
 
 import sys
 from dataclasses import dataclass, replace
-from typing import TextIO
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
+
+if TYPE_CHECKING:
+    from ._history import History
+    from ._progress import Progress
 
 
 @dataclass(frozen=True)
 class Config:
     stream: TextIO = sys.stdout
     opcodes: bool = False
+    opnames: bool = False
     allocations: bool = False
+    incremental_allocations: bool = False
     histogram_lines: int | None = None
+    output: TextIO | None = None
+    precision: float | None = None
+    calibrate: bool = False
+    threads: int = 0
+    hot_lines: int = 0
+    memory: bool = False
+    counters: bool = False
+    results_cache: Path | None = None
+    force: bool = False
+    loops_cache: Path | None = None
+    history: History | None = None
+    progress: Progress | None = None
 
     def evolve(self, **kwargs) -> Config:
         return replace(self, **kwargs)
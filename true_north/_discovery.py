@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import marshal
+import os
+import sys
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from types import CodeType
+from typing import Any, Iterator
+
+
+# The default directory where discovered groups and compiled code are cached.
+CACHE_DIR = Path('.true_north_cache')
+# Increment when the format of the cached data changes.
+CACHE_VERSION = 2
+
+
+# Nodes whose body isn't executed on import, at least not right away.
+SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+# Nodes whose body can be executed any number of times.
+LOOPS = (
+    ast.For, ast.AsyncFor, ast.While,
+    ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp,
+)
+
+
+def _is_stdlib(module: str) -> bool:
+    """Check if the module is from the standard library, so it defines no groups.
+
+    Before Python 3.10, there is no list of stdlib modules,
+    and so no module is considered stdlib.
+    """
+    names = getattr(sys, 'stdlib_module_names', ())
+    return module.split('.')[0] in names
+
+
+def _walk_module(tree: ast.AST, in_loop: bool = False) -> Iterator[tuple[ast.AST, bool]]:
+    """Yield all nodes executed on import and whether they are inside of a loop.
+
+    Bodies of functions and classes are skipped.
+    """
+    for node in ast.iter_child_nodes(tree):
+        if isinstance(node, SCOPES):
+            continue
+        yield node, in_loop
+        yield from _walk_module(node, in_loop or isinstance(node, LOOPS))
+
+
+def find_groups(source: str | bytes, path: Path) -> list[str] | None:
+    """Find names of all groups defined in the source code without running it.
+
+    Unnamed groups get the same name as `Group` gives them at runtime.
+    If any group name can be known only by executing the code,
+    None is returned. That includes groups created in functions or loops
+    and groups that might come from other modules: names imported
+    from modules outside of the standard library, or module-level code
+    using such modules.
+    """
+    tree = ast.parse(source, filename=str(path))
+    # names under which the Group class and the true_north module are imported
+    classes = {'Group'}
+    modules = {'true_north'}
+    # names under which third-party and local modules are imported
+    external: set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == 'true_north':
+            for alias in node.names:
+                if alias.name == 'Group':
+                    classes.add(alias.asname or alias.name)
+                if alias.name == '*':
+                    classes.add('Group')
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name == 'true_north':
+                    modules.add(alias.asname or alias.name)
+                elif not _is_stdlib(alias.name):
+                    external.add(alias.asname or alias.name.split('.')[0])
+
+    calls = {node for node in ast.walk(tree) if _is_group_call(node, classes, modules)}
+    top_calls = []
+    for node, in_loop in _walk_module(tree):
+        if isinstance(node, ast.ImportFrom):
+            module = node.module or ''
+            if node.level or (module != 'true_north' and not _is_stdlib(module)):
+                return None
+        if isinstance(node, ast.Name) and node.id in external:
+            return None
+        if node in calls:
+            if in_loop:
+                return None
+            top_calls.append(node)
+    if len(top_calls) != len(calls):
+        # some groups are created in functions
+        return None
+
+    groups = []
+    for node in top_calls:
+        assert isinstance(node, ast.Call)
+        name_node: ast.expr | None = None
+        if node.args:
+            name_node = node.args[0]
+        for keyword in node.keywords:
+            if keyword.arg == 'name':
+                name_node = keyword.value
+            if keyword.arg is None:
+                return None
+        if name_node is None:
+            groups.append(f'{path.name}:{node.lineno}')
+            continue
+        if not isinstance(name_node, ast.Constant):
+            return None
+        if name_node.value is None:
+            groups.append(f'{path.name}:{node.lineno}')
+            continue
+        if not isinstance(name_node.value, str):
+            return None
+        groups.append(name_node.value)
+    return groups
+
+
+def _is_group_call(node: ast.AST, classes: set[str], modules: set[str]) -> bool:
+    """Check if the node creates a new `Group`.
+    """
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id in classes
+    if isinstance(func, ast.Attribute):
+        if func.attr != 'Group':
+            return False
+        return isinstance(func.value, ast.Name) and func.value.id in modules
+    return False
+
+
+def write_atomic(path: Path, content: bytes) -> None:
+    """Write the file so that concurrent readers never see it half-written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(dir=path.parent, delete=False) as stream:
+        stream.write(content)
+    os.replace(stream.name, path)
+
+
+def load_code(path: Path, cache_dir: Path | None = None) -> CodeType:
+    """Compile the python file, reusing the code object cached on a previous run.
+    """
+    source = path.read_bytes()
+    if cache_dir is None:
+        return compile(source, filename=str(path), mode='exec')
+    key = hashlib.sha256()
+    key.update(sys.version.encode())
+    key.update(str(path).encode())
+    key.update(source)
+    code_path = cache_dir / 'code' / f'{key.hexdigest()}.marshal'
+    if code_path.exists():
+        try:
+            return marshal.loads(code_path.read_bytes())
+        except (EOFError, ValueError, TypeError):
+            pass
+    code = compile(source, filename=str(path), mode='exec')
+    write_atomic(code_path, marshal.dumps(code))
+    return code
+
+
+class Index:
+    """The cache of groups discovered in each file.
+
+    A file is parsed again only if its modification time, size,
+    and content hash changed.
+    """
+    __slots__ = ('_path', '_files', '_changed')
+
+    _path: Path
+    _files: dict[str, dict[str, Any]]
+    _changed: bool
+
+    def __init__(self, cache_dir: Path) -> None:
+        self._path = cache_dir / 'index.json'
+        self._files = {}
+        self._changed = False
+        try:
+            data = json.loads(self._path.read_text(encoding='utf8'))
+        except (OSError, ValueError):
+            return
+        if data.get('version') == CACHE_VERSION:
+            self._files = data['files']
+
+    def get_groups(self, path: Path) -> list[str] | None:
+        """Names of groups defined in the file. None if not known statically.
+        """
+        key = str(path.resolve())
+        stat = path.stat()
+        entry = self._files.get(key)
+        if entry is not None:
+            if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                return entry['groups']
+        source = path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        if entry is None or entry['hash'] != digest:
+            try:
+                groups = find_groups(source, path=path)
+            except SyntaxError:
+                groups = None
+        else:
+            groups = entry['groups']
+        self._files[key] = dict(
+            mtime=stat.st_mtime_ns,
+            size=stat.st_size,
+            hash=digest,
+            groups=groups,
+        )
+        self._changed = True
+        return groups
+
+    def has_groups(self, path: Path, names: list[str]) -> bool:
+        """Check if the file might define any of the groups with the given names.
+        """
+        groups = self.get_groups(path)
+        if groups is None:
+            return True
+        return bool(set(groups) & set(names))
+
+    def save(self) -> None:
+        """Write the index on the disk if anything has changed.
+        """
+        if not self._changed:
+            return
+        data = dict(version=CACHE_VERSION, files=self._files)
+        write_atomic(self._path, json.dumps(data).encode())
+        self._changed = False
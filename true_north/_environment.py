@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import platform
+import subprocess
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from ._system import get_system_info
+
+
+def get_cpu() -> str:
+    """The human-friendly name of the CPU model.
+    """
+    cpuinfo = Path('/proc/cpuinfo')
+    if cpuinfo.exists():
+        for line in cpuinfo.read_text().splitlines():
+            if line.startswith('model name'):
+                return line.partition(':')[-1].strip()
+    return platform.processor() or platform.machine()
+
+
+def get_commit() -> str | None:
+    """The current git commit of the working directory, if any.
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.decode().strip()
+
+
+def get_branch() -> str | None:
+    """The current git branch of the working directory, if any.
+    """
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    branch = result.stdout.decode().strip()
+    if branch == 'HEAD':
+        # detached HEAD
+        return None
+    return branch
+
+
+def get_fingerprint() -> str:
+    """A short hash identifying the machine.
+
+    Results from machines with different fingerprints shouldn't be compared.
+    """
+    parts = (
+        platform.node(),
+        platform.system(),
+        platform.machine(),
+        get_cpu(),
+        os.cpu_count(),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def get_environment() -> dict[str, Any]:
+    """Metadata about the environment where benchmarks are running.
+
+    The result is cached, so it is collected only once per process.
+    """
+    return dict(
+        python=sys.version.split()[0],
+        implementation=platform.python_implementation(),
+        platform=platform.platform(),
+        machine=platform.machine(),
+        cpu=get_cpu(),
+        commit=get_commit(),
+        branch=get_branch(),
+        fingerprint=get_fingerprint(),
+        system=get_system_info(),
+    )
@@ -3,12 +3,13 @@ from __future__ import annotations
 import inspect
 import os
 from time import perf_counter
-from typing import Callable
+from typing import Any, Callable, Iterable
 
 from ._check import Check, Func
 from ._colors import colors
 from ._config import DEFAULT_CONFIG, Config
 from ._loopers import Timer
+from ._report import Report
 
 
 class Group:
@@ -43,11 +44,22 @@ class Group:
         repeats: int = 5,
         min_time: float = .2,
         timer: Timer = perf_counter,
+        precision: float | None = None,
+        max_repeats: int = 100,
+        max_time: float = 10.,
+        sizes: Iterable[int] = (),
+        setup: Callable[..., Any] | None = None,
+        teardown: Callable[[Any], Any] | None = None,
+        per_iteration: bool = False,
     ) -> Callable[[Func], Check]:
         """Register a new benchmark function in the group.
 
         The first registered benchmark will be used as the baseline for all others.
 
+        The benchmark can be an async function. Then it should use `async for`
+        to iterate over loops, and it will be executed in the event loop
+        reused by all async benchmarks.
+
         Args:
             name: if not specified, the function name will be used.
             loops: how many times to run the benchmark in each repeat.
@@ -58,8 +70,33 @@ class Group:
                 to reduce how external factors affect the results.
             min_time: the minimum run time to target if `loops` is not specified.
             timer: function used to get the current time.
+            precision: if specified, keep repeating the benchmark until
+                the 95% confidence interval of repeats gets within this fraction
+                of the median. For example, 0.01 means ±1%.
+                `repeats` is used as the minimum number of repeats.
+            max_repeats: the maximum number of repeats when `precision` is specified.
+            max_time: the maximum time in seconds to spend on repeats
+                when `precision` is specified.
+            sizes: if specified, run the benchmark for each of the input sizes
+                and detect its complexity, like O(n) or O(n log n).
+                All sizes must be positive, log(0) isn't defined.
+                The size is passed into the benchmark as the second argument.
+                Opcodes, allocations, and threads are checked only for
+                the largest size.
+            setup: the function to call before each repeat. The value it returns
+                is yielded by the looper on each iteration instead of the loop number.
+                If `sizes` are specified, the setup function accepts the size.
+            teardown: the function to call after each repeat
+                with each value produced by `setup`.
+            per_iteration: call `setup` for each iteration instead of each repeat.
+                All values are produced before the repeat starts, so they don't
+                affect the timing but all of them are kept in memory.
 
         """
+        sizes = tuple(sorted(sizes))
+        if sizes and sizes[0] <= 0:
+            raise ValueError(f'sizes must be positive, got {sizes[0]}')
+
         def wrapper(func: Func) -> Check:
             check = Check(
                 func=func,
@@ -68,6 +105,13 @@ class Group:
                 repeats=repeats,
                 min_time=min_time,
                 timer=timer,
+                precision=precision,
+                max_repeats=max_repeats,
+                max_time=max_time,
+                sizes=sizes,
+                setup=setup,
+                teardown=teardown,
+                per_iteration=per_iteration,
             )
             self._checks.append(check)
             return check
@@ -87,10 +131,16 @@ class Group:
                 Default is stdout.
             opcodes: count opcodes. Slow but reproducible.
             allocations: track memory allocations. Slow but interesting.
+            output: the stream where to write results of each check
+                as newline-delimited JSON.
         """
-        base_time: float | None = None
+        base: Report | None = None
         print(colors.blue(self.name), file=config.stream)
         for check in self._checks:
-            result = check.print(config=config, base_time=base_time)
-            if base_time is None:
-                base_time = result.best
+            report = check.print_report(
+                config=config,
+                group=self.name,
+                base=base,
+            )
+            if base is None:
+                base = report
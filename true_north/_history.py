@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import NamedTuple, Sequence, TextIO
+
+from ._colors import colors
+from ._environment import get_environment
+from ._report import Report
+from ._results._formatters import (
+    format_amount, format_size, format_time, make_histogram,
+)
+
+
+# The default path to the history database.
+HISTORY_PATH = Path('.true_north_history.sqlite')
+# How many results to keep in memory before writing them into the database.
+BATCH_SIZE = 50
+# Metrics that can be tracked and the columns where they are stored.
+METRICS = {
+    'time': 'best',
+    'opcodes': 'opcodes',
+    'allocations': 'allocations',
+    'memory': 'memory',
+}
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    commit_hash TEXT,
+    branch TEXT,
+    fingerprint TEXT NOT NULL,
+    python TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    grp TEXT NOT NULL,
+    name TEXT NOT NULL,
+    best REAL NOT NULL,
+    stdev REAL NOT NULL,
+    opcodes INTEGER,
+    allocations INTEGER,
+    memory INTEGER,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_check ON results (grp, name);
+"""
+
+
+class Point(NamedTuple):
+    """The value of a metric for a check in a single run.
+    """
+    run: int
+    created: float
+    commit: str | None
+    branch: str | None
+    value: float
+
+
+def find_regression(values: Sequence[float], threshold: float = .1) -> int | None:
+    """The index of the value since which all values are slower than the best one.
+
+    A value is slower if it's more than `threshold` (a fraction) above
+    the best (lowest) value before it. If the last value isn't slower,
+    there is no regression and None is returned.
+    """
+    if not values:
+        return None
+    best = min(range(len(values)), key=values.__getitem__)
+    limit = values[best] * (1 + threshold)
+    index = None
+    for i in range(len(values) - 1, best, -1):
+        if values[i] <= limit:
+            break
+        index = i
+    return index
+
+
+class History:
+    """SQLite database with results of all runs.
+
+    Results are written in batches, so recording them doesn't slow the run.
+    Several processes can write into the same database,
+    each opening its own connection with the same `run`.
+    """
+    __slots__ = ('_conn', '_run', '_buffer')
+
+    _conn: sqlite3.Connection
+    _run: int | None
+    _buffer: list[tuple]
+
+    def __init__(self, path: Path, run: int | None = None) -> None:
+        self._conn = sqlite3.connect(str(path), timeout=30)
+        self._conn.executescript(SCHEMA)
+        self._run = run
+        self._buffer = []
+
+    @property
+    def run(self) -> int | None:
+        """The ID of the current run, if started.
+        """
+        return self._run
+
+    def start_run(self) -> int:
+        """Record the current run: the git commit, branch, and the machine.
+        """
+        env = get_environment()
+        with self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO runs (created, commit_hash, branch, fingerprint, python) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (
+                    time.time(),
+                    env['commit'],
+                    env['branch'],
+                    env['fingerprint'],
+                    f"{env['implementation']} {env['python']}",
+                ),
+            )
+        assert cursor.lastrowid is not None
+        self._run = cursor.lastrowid
+        return self._run
+
+    def add(self, report: Report) -> None:
+        """Record all results of the check.
+        """
+        if self._run is None:
+            self.start_run()
+        data = report.to_dict()
+        # stored in the runs table
+        data.pop('env', None)
+        opcodes = None
+        if report.opcodes is not None:
+            opcodes = report.opcodes.opcodes_count
+        allocations = None
+        if report.mallocs is not None:
+            allocations = report.mallocs.total_allocs
+        memory = None
+        if report.memory is not None:
+            memory = report.memory.peak
+        self._buffer.append((
+            self._run,
+            report.group,
+            report.check,
+            report.timing.best,
+            report.timing.stdev,
+            opcodes,
+            allocations,
+            memory,
+            json.dumps(data),
+        ))
+        if len(self._buffer) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered results into the database in a single transaction.
+        """
+        if not self._buffer:
+            return
+        with self._conn:
+            self._conn.executemany(
+                'INSERT INTO results '
+                '(run, grp, name, best, stdev, opcodes, allocations, memory, report) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                self._buffer,
+            )
+        self._buffer = []
+
+    def get_checks(self) -> list[tuple[str, str]]:
+        """All recorded (group, check) pairs in the order they were first recorded.
+        """
+        cursor = self._conn.execute(
+            'SELECT grp, name FROM results GROUP BY grp, name ORDER BY MIN(rowid)',
+        )
+        return list(cursor)
+
+    def get_points(
+        self,
+        group: str,
+        check: str,
+        metric: str = 'time',
+        fingerprint: str | None = None,
+        limit: int | None = None,
+    ) -> list[Point]:
+        """Values of the metric for the check in each run, the oldest first.
+
+        If `fingerprint` is specified, only results from that machine
+        are returned. If `limit` is specified, only that many latest runs.
+        """
+        column = METRICS[metric]
+        query = (
+            f'SELECT runs.id, runs.created, runs.commit_hash, runs.branch, '
+            f'MIN(results.{column}) '
+            f'FROM results JOIN runs ON results.run = runs.id '
+            f'WHERE results.grp = ? AND results.name = ? '
+            f'AND results.{column} IS NOT NULL '
+        )
+        params: list = [group, check]
+        if fingerprint is not None:
+            query += 'AND runs.fingerprint = ? '
+            params.append(fingerprint)
+        query += 'GROUP BY runs.id ORDER BY runs.id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        points = [Point(*row) for row in self._conn.execute(query, params)]
+        points.reverse()
+        return points
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> History:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def format_value(value: float, metric: str) -> str:
+    if metric == 'time':
+        return format_time(value).strip()
+    if metric == 'memory':
+        return format_size(value, rjust=0).strip()
+    return format_amount(value)
+
+
+def print_history(
+    history: History,
+    stream: TextIO,
+    metric: str = 'time',
+    groups: Sequence[str] = (),
+    fingerprint: str | None = None,
+    limit: int | None = None,
+    threshold: float = .1,
+) -> None:
+    """Print how each check changed across runs.
+
+    For each check, shows a sparkline of the metric value in each run,
+    the first and the last values, and the commit since which
+    the check is slower than its best result, if any.
+    """
+    last_group = None
+    for group, check in history.get_checks():
+        if groups and group not in groups:
+            continue
+        points = history.get_points(
+            group=group,
+            check=check,
+            metric=metric,
+            fingerprint=fingerprint,
+            limit=limit,
+        )
+        if not points:
+            continue
+        if group != last_group:
+            print(colors.blue(group), file=stream)
+            last_group = group
+        print(f'  {colors.magenta(check)}', file=stream)
+        values = [p.value for p in points]
+        line = '{chart} {runs} {noun}: {first} → {last}'.format(
+            chart=colors.green(make_histogram(values, lines=1)),
+            runs=len(points),
+            noun='run' if len(points) == 1 else 'runs',
+            first=format_value(values[0], metric),
+            last=format_value(values[-1], metric),
+        )
+        # no ratio if either value is 0, like when the check stopped allocating
+        if values[0] and values[-1] and values[-1] != values[0]:
+            ratio = values[-1] / values[0]
+            if ratio > 1:
+                line += f' {colors.red(f"x{ratio:.02f}")}'
+            else:
+                line += f' {colors.green(f"/{1 / ratio:.02f}")}'
+        print(f'    {line}', file=stream)
+        index = find_regression(values, threshold=threshold)
+        if index is None:
+            continue
+        point = points[index]
+        commit = (point.commit or 'unknown commit')[:10]
+        if point.branch:
+            commit += f' ({point.branch})'
+        line = f'{colors.yellow("regressed")} in {commit}'
+        best = min(values[:index])
+        if best:
+            line += f': x{values[-1] / best:.02f} of the best'
+        print(f'    {line}', file=stream)
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import marshal
+import multiprocessing
+import sys
+import traceback
+from dataclasses import fields
+from io import StringIO
+from pathlib import Path
+from typing import Any, Iterator
+
+from ._check import show_report
+from ._colors import colors
+from ._config import Config
+from ._discovery import load_code
+from ._group import Group
+from ._progress import Progress
+from ._report import Report
+
+
+# Config fields that make sense only in the main process.
+LOCAL_FIELDS = frozenset({'stream', 'output', 'history', 'progress'})
+# How checks are grouped into worker processes.
+MODES = ('check', 'group')
+
+
+def _run_checks(
+    conn,
+    group: Group,
+    indices: list[int],
+    options: dict[str, Any],
+    progress: bool,
+) -> None:
+    """Run checks with the given indices and send their reports into the pipe.
+
+    Each message is a marshaled dict, it's compact and fast to load.
+    The progress, if enabled, is drawn by the worker right into stderr.
+    """
+    try:
+        config = Config(
+            stream=StringIO(),
+            progress=Progress(sys.stderr) if progress else None,
+            **options,
+        )
+        for index in indices:
+            report = group._checks[index].print_report(config=config, group=group.name)
+            conn.send_bytes(marshal.dumps(dict(report=report.to_dict())))
+    except BaseException:
+        conn.send_bytes(marshal.dumps(dict(error=traceback.format_exc())))
+    finally:
+        conn.close()
+
+
+def _fork_worker(
+    conn,
+    group: Group,
+    indices: list[int],
+    options: dict[str, Any],
+    progress: bool,
+) -> None:
+    """The entry point of a worker forked from the process that loaded the group.
+    """
+    _run_checks(conn, group=group, indices=indices, options=options, progress=progress)
+
+
+def _spawn_worker(
+    conn,
+    path: str,
+    name: str,
+    indices: list[int],
+    options: dict[str, Any],
+    progress: bool,
+    cache_dir: Path | None,
+    uvloop: bool,
+) -> None:
+    """The entry point of a worker in a fresh interpreter.
+
+    The file with benchmarks is executed again to find the group by name.
+    """
+    globals: dict[str, object] = {}
+    try:
+        exec(load_code(Path(path), cache_dir=cache_dir), globals)
+        if uvloop:
+            from ._aio import use_uvloop
+            use_uvloop()
+        groups = [g for g in globals.values() if isinstance(g, Group) and g.name == name]
+        if not groups:
+            raise LookupError(f'group {name} not found in {path}')
+    except BaseException:
+        conn.send_bytes(marshal.dumps(dict(error=traceback.format_exc())))
+        conn.close()
+        return
+    _run_checks(
+        conn,
+        group=groups[0],
+        indices=indices,
+        options=options,
+        progress=progress,
+    )
+
+
+def _run_worker(
+    group: Group,
+    indices: list[int],
+    options: dict[str, Any],
+    progress: bool,
+    path: Path,
+    warm_fork: bool,
+    cache_dir: Path | None,
+    uvloop: bool,
+) -> Iterator[Report]:
+    """Run checks in a new worker process and yield reports as they arrive.
+    """
+    context: Any = multiprocessing.get_context('fork' if warm_fork else 'spawn')
+    receiver, sender = context.Pipe(duplex=False)
+    if warm_fork:
+        # The group isn't pickled, the forked process inherits it.
+        process = context.Process(
+            target=_fork_worker,
+            args=(sender, group, indices, options, progress),
+        )
+    else:
+        process = context.Process(
+            target=_spawn_worker,
+            args=(
+                sender, str(path), group.name, indices,
+                options, progress, cache_dir, uvloop,
+            ),
+        )
+    process.start()
+    sender.close()
+    received = 0
+    try:
+        while True:
+            try:
+                message = marshal.loads(receiver.recv_bytes())
+            except EOFError:
+                break
+            if 'error' in message:
+                raise RuntimeError(f'worker failed:\n{message["error"]}')
+            received += 1
+            yield Report.from_dict(message['report'])
+    finally:
+        receiver.close()
+        process.join()
+    if received < len(indices):
+        raise RuntimeError(f'worker exited with code {process.exitcode}')
+
+
+def run_isolated(
+    group: Group,
+    config: Config,
+    path: Path,
+    mode: str = 'check',
+    warm_fork: bool = False,
+    cache_dir: Path | None = None,
+    uvloop: bool = False,
+) -> None:
+    """Run checks of the group in separate worker processes and print results.
+
+    In the `check` mode, each check runs in its own worker. In the `group`
+    mode, all checks of the group run in the same worker. So, caches,
+    the heap, and imports of a check don't affect checks in other workers.
+
+    By default, workers are fresh interpreters executing the file again.
+    If `warm_fork` is True, workers are forked from the current process
+    which already executed the file, so they start much faster.
+    """
+    assert mode in MODES
+    options = {
+        field.name: getattr(config, field.name)
+        for field in fields(config)
+        if field.name not in LOCAL_FIELDS
+    }
+    indices = list(range(len(group._checks)))
+    batches = [indices] if mode == 'group' else [[index] for index in indices]
+    print(colors.blue(group.name), file=config.stream)
+    base: Report | None = None
+    for batch in batches:
+        reports = _run_worker(
+            group=group,
+            indices=batch,
+            options=options,
+            progress=config.progress is not None,
+            path=path,
+            warm_fork=warm_fork,
+            cache_dir=cache_dir,
+            uvloop=uvloop,
+        )
+        for report in reports:
+            show_report(report, config=config, base=base)
+            if base is None:
+                base = report
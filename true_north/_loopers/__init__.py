@@ -1,12 +1,17 @@
 from ._common import Timer
 from ._each import EachLooper
 from ._memory import MemoryLooper
-from ._opcode import OpcodeLooper
+from ._opcode import LineStats, OpcodeLooper
+from ._timings import Timings, TimingsBuffer, TimingsHistogram
 from ._total import TotalLooper
 
 
 __all__ = [
+    'LineStats',
     'Timer',
+    'Timings',
+    'TimingsBuffer',
+    'TimingsHistogram',
     'EachLooper',
     'MemoryLooper',
     'OpcodeLooper',
@@ -1,18 +1,141 @@
 from __future__ import annotations
 
+import os
 import sys
-from contextlib import contextmanager
-from typing import Callable, Iterator
+from types import CodeType, FrameType
+from typing import Any, Callable, Iterable
 
 
 Timer = Callable[[], float]
 
+# sys.monitoring (PEP 669) is a low-overhead alternative to sys.settrace.
+HAS_MONITORING = sys.version_info >= (3, 12)
+# Code of true-north itself (loopers, the event loop wrappers, etc.)
+# is never traced.
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
-@contextmanager
-def tracer_context(tracer: Callable) -> Iterator:
-    old_tracer = sys.gettrace()
-    sys.settrace(tracer)
-    try:
-        yield
-    finally:
-        sys.settrace(old_tracer)
+
+class Tracer:
+    """Context manager setting the global tracer (sys.settrace).
+
+    If `frame` is specified, the local tracer is set for it,
+    including opcode events if `opcodes` is True.
+
+    It's not a generator-based context manager on purpose:
+    the code of the context manager itself must not be traced.
+    """
+    __slots__ = ('_tracer', '_frame', '_ltracer', '_opcodes', '_old_tracer')
+
+    def __init__(
+        self,
+        tracer: Callable,
+        frame: FrameType | None = None,
+        ltracer: Callable | None = None,
+        opcodes: bool = True,
+    ) -> None:
+        self._tracer = tracer
+        self._frame = frame
+        self._ltracer = ltracer
+        self._opcodes = opcodes
+        self._old_tracer: Callable | None = None
+
+    def __enter__(self) -> None:
+        if self._frame is not None:
+            self._frame.f_trace = self._ltracer
+            self._frame.f_trace_opcodes = self._opcodes
+        self._old_tracer = sys.gettrace()
+        sys.settrace(self._tracer)
+
+    def __exit__(self, *exc_info) -> None:
+        sys.settrace(self._old_tracer)
+        if self._frame is not None:
+            self._frame.f_trace = None
+            self._frame.f_trace_opcodes = False
+
+
+def is_internal(code: CodeType) -> bool:
+    """Check if the code belongs to true-north and so must not be traced.
+    """
+    return code.co_filename.startswith(PACKAGE_DIR + os.sep)
+
+
+def get_items(loops: int, items: Iterable[Any] | None) -> Iterable[Any]:
+    """Values to yield from the looper, loop numbers if no items specified.
+    """
+    if items is None:
+        return range(loops)
+    return items
+
+
+def get_tool_id() -> int | None:
+    """Find a free sys.monitoring tool ID.
+
+    Returns None if sys.monitoring is not available or all IDs are taken.
+    """
+    if not HAS_MONITORING:
+        return None
+    mon = sys.monitoring  # type: ignore[attr-defined]
+    for tool_id in (mon.PROFILER_ID, *range(6)):
+        if mon.get_tool(tool_id) is None:
+            return tool_id
+    return None
+
+
+class Monitor:
+    """Context manager delivering sys.monitoring events to the callbacks.
+
+    The events are emitted only for the given code object and code objects
+    of all functions called from it, except loopers themselves.
+    Code objects are discovered on calls (PY_START event)
+    and then only local events are enabled for them,
+    so the rest of the code doesn't pay for monitoring.
+
+    It's not a generator-based context manager on purpose:
+    the code of the context manager itself must not be monitored.
+    """
+    __slots__ = ('_tool_id', '_code', '_callbacks', '_codes', '_events')
+
+    def __init__(
+        self,
+        tool_id: int,
+        code: CodeType,
+        callbacks: dict[int, Callable],
+    ) -> None:
+        self._tool_id = tool_id
+        self._code = code
+        self._callbacks = callbacks
+        self._codes: set[CodeType] = set()
+        self._events = 0
+        for event in callbacks:
+            self._events |= event
+
+    def _on_start(self, code: CodeType, offset: int) -> None:
+        # Returning DISABLE would be faster but then, on the next run,
+        # the event must be enabled again with `restart_events`,
+        # which also restarts events disabled by other tools,
+        # like coverage or profilers running in the same process.
+        if code in self._codes or is_internal(code):
+            return
+        mon = sys.monitoring  # type: ignore[attr-defined]
+        mon.set_local_events(self._tool_id, code, self._events)
+        self._codes.add(code)
+
+    def __enter__(self) -> None:
+        mon = sys.monitoring  # type: ignore[attr-defined]
+        mon.use_tool_id(self._tool_id, 'true-north')
+        for event, callback in self._callbacks.items():
+            mon.register_callback(self._tool_id, event, callback)
+        mon.register_callback(self._tool_id, mon.events.PY_START, self._on_start)
+        self._codes = {self._code}
+        mon.set_local_events(self._tool_id, self._code, self._events)
+        mon.set_events(self._tool_id, mon.events.PY_START)
+
+    def __exit__(self, *exc_info) -> None:
+        mon = sys.monitoring  # type: ignore[attr-defined]
+        mon.set_events(self._tool_id, 0)
+        for code in self._codes:
+            mon.set_local_events(self._tool_id, code, 0)
+        for event in self._callbacks:
+            mon.register_callback(self._tool_id, event, None)
+        mon.register_callback(self._tool_id, mon.events.PY_START, None)
+        mon.free_tool_id(self._tool_id)
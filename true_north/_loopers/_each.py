@@ -1,23 +1,52 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterator
+from typing import Any, AsyncIterator, Iterable, Iterator
 
-from ._common import Timer
+from ._common import Timer, get_items
 
 
 @dataclass
 class EachLooper:
     """Iterator that tracks the execution time of each iteration.
+
+    Supports both `for` and `async for`.
+    If `items` are specified, they are yielded instead of loop numbers.
+    If `max_time` is specified, the loop stops early when that much time
+    has passed, but only after at least two iterations.
     """
     loops: int
     timer: Timer
     timings: list[float]
+    items: Iterable[Any] | None = None
+    max_time: float | None = None
 
     def __iter__(self) -> Iterator[int]:
         self.timings = []
-        for i in range(self.loops):
+        began = self.timer()
+        for item in get_items(self.loops, self.items):
+            start = self.timer()
+            yield item
+            stop = self.timer()
+            self.timings.append(stop - start)
+            if self._expired(began, stop):
+                return
+
+    def __aiter__(self) -> AsyncIterator[int]:
+        return self._aiter()
+
+    async def _aiter(self) -> AsyncIterator[int]:
+        self.timings = []
+        began = self.timer()
+        for item in get_items(self.loops, self.items):
             start = self.timer()
-            yield i
+            yield item
             stop = self.timer()
             self.timings.append(stop - start)
+            if self._expired(began, stop):
+                return
+
+    def _expired(self, began: float, now: float) -> bool:
+        if self.max_time is None or len(self.timings) < 2:
+            return False
+        return now - began >= self.max_time
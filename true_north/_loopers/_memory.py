@@ -1,51 +1,180 @@
 from __future__ import annotations
 
+import inspect
+import sys
 import tracemalloc
 from collections import Counter
 from dataclasses import dataclass, field
-from typing import Iterator
+from time import perf_counter
+from types import CodeType, FrameType
+from typing import Any, AsyncIterator, ContextManager, Iterable, Iterator
 
-from ._common import tracer_context
+from ._common import Monitor, Tracer, get_items, get_tool_id, is_internal
+from ._opcode import get_offsets
+
+
+# How many lines to wait before the first snapshot in the incremental mode,
+# relative to the sampling period.
+SNAPSHOT_PERIOD = 10
+# The max share of time the incremental mode may spend on taking snapshots.
+SNAPSHOT_BUDGET = .1
 
 
 @dataclass
 class MemoryLooper:
+    """Iterator that samples memory allocations every `period` lines.
+
+    On Python 3.12+, sys.monitoring is used if `monitoring` is True,
+    which is much faster than the sys.settrace fallback.
+
+    In the `incremental` mode, the total memory is sampled every `period` lines
+    using the cheap `tracemalloc.get_traced_memory`. Snapshots, which cost grows
+    with the heap size, are taken much less often, filtered to include
+    only allocations from the benchmarked files, and the snapshot period doubles
+    each time snapshotting takes more than SNAPSHOT_BUDGET of the execution time.
+    """
     period: int
     loops: int = 1
     lines: int = 0
     totals: list[int] = field(default_factory=list)
     allocs: list[Counter[str]] = field(default_factory=list)
+    monitoring: bool = True
+    incremental: bool = False
+    items: Iterable[Any] | None = None
     _prev_allocs: Counter[str] = field(default_factory=Counter)
+    _files: set[str] = field(default_factory=set)
+    _snapshot: tracemalloc.Snapshot | None = None
+    _snapshot_period: int = 0
+    _snapshot_line: int = 0
+    _snapshot_time: float = 0
+    _offsets: dict[CodeType, dict[int, int]] = field(default_factory=dict)
 
     def ltracer(self, frame, event: str, arg):
         """Local tracer attached to each function.
         """
         if event == 'line' and frame.f_code.co_filename != __file__:
-            self.lines += 1
-            if self.lines % self.period == 0:
-                # gc.collect()
-                snapshot = tracemalloc.take_snapshot()
-                total = 0
-                allocs: Counter[str] = Counter()
-                for trace in snapshot.traces:
-                    total += trace.size
-                    file_name = trace.traceback[-1].filename
-                    allocs[file_name] += 1
-                self.totals.append(total)
-                diff = allocs - self._prev_allocs
-                self.allocs.append(diff)
-                self._prev_allocs = allocs
+            self.on_line(frame.f_code, frame.f_lineno)
 
     def gtracer(self, frame, event: str, arg):
         """Global tracer executed for all functions.
         """
-        if event == 'call':
+        if event == 'call' and not is_internal(frame.f_code):
             return self.ltracer
 
+    def on_line(self, code: CodeType, line: int) -> None:
+        """Callback for a new line executed. Also used for sys.monitoring LINE event.
+        """
+        if self.incremental:
+            self._on_line_incremental(code)
+            return
+        self.lines += 1
+        if self.lines % self.period == 0:
+            # gc.collect()
+            snapshot = tracemalloc.take_snapshot()
+            total = 0
+            allocs: Counter[str] = Counter()
+            for trace in snapshot.traces:
+                total += trace.size
+                file_name = trace.traceback[-1].filename
+                allocs[file_name] += 1
+            self.totals.append(total)
+            diff = allocs - self._prev_allocs
+            self.allocs.append(diff)
+            self._prev_allocs = allocs
+
+    def on_jump(self, code: CodeType, offset: int, target: int) -> None:
+        """Callback for sys.monitoring JUMP event.
+
+        Unlike sys.settrace, sys.monitoring doesn't emit LINE event
+        when jumping back to the same line, like in `for _ in r: x = [1]`.
+        Such jumps are counted as lines, so that one-line loops are sampled too.
+        """
+        if target >= offset:
+            return
+        offsets = self._offsets.get(code)
+        if offsets is None:
+            offsets = get_offsets(code)
+            self._offsets[code] = offsets
+        line = offsets.get(offset)
+        if line is not None and line == offsets.get(target):
+            self.on_line(code, line)
+
+    def _on_line_incremental(self, code: CodeType) -> None:
+        self.lines += 1
+        self._files.add(code.co_filename)
+        if self.lines % self.period != 0:
+            return
+        self.totals.append(tracemalloc.get_traced_memory()[0])
+        if self.lines - self._snapshot_line < self._snapshot_period:
+            return
+        start = perf_counter()
+        self._take_snapshot()
+        stop = perf_counter()
+        if stop - start > (start - self._snapshot_time) * SNAPSHOT_BUDGET:
+            self._snapshot_period *= 2
+        self._snapshot_line = self.lines
+        self._snapshot_time = stop
+
+    def _take_snapshot(self) -> None:
+        """Record allocations in the benchmarked files since the previous snapshot.
+        """
+        filters = [tracemalloc.Filter(True, name) for name in self._files]
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        assert self._snapshot is not None
+        allocs: Counter[str] = Counter()
+        for stat in snapshot.compare_to(self._snapshot, 'filename'):
+            if stat.count_diff > 0:
+                allocs[stat.traceback[0].filename] += stat.count_diff
+        self.allocs.append(allocs)
+        self._snapshot = snapshot
+
     def __iter__(self) -> Iterator[int]:
+        frame = inspect.currentframe()
+        assert frame
+        frame = frame.f_back
+        assert frame
+        self._start()
+        with self._context(frame):
+            for item in get_items(self.loops, self.items):
+                yield item
+        self._stop()
+
+    def __aiter__(self) -> AsyncIterator[int]:
+        # Unlike the generator in __iter__, the async generator isn't running yet,
+        # so the benchmarking function frame must be detected here.
+        frame = inspect.currentframe()
+        assert frame
+        frame = frame.f_back
+        assert frame
+        return self._aiter(frame)
+
+    async def _aiter(self, frame: FrameType) -> AsyncIterator[int]:
+        self._start()
+        with self._context(frame):
+            for item in get_items(self.loops, self.items):
+                yield item
+        self._stop()
+
+    def _context(self, frame: FrameType) -> ContextManager:
+        tool_id = get_tool_id() if self.monitoring else None
+        if tool_id is None:
+            return Tracer(self.gtracer, frame=frame, ltracer=self.ltracer, opcodes=False)
+        events = sys.monitoring.events  # type: ignore[attr-defined]
+        return Monitor(tool_id, frame.f_code, {
+            events.LINE: self.on_line,
+            events.JUMP: self.on_jump,
+        })
+
+    def _start(self) -> None:
         tracemalloc.start()
         self.totals = []
-        with tracer_context(self.gtracer):
-            for i in range(self.loops):
-                yield i
+        if self.incremental:
+            self._snapshot = tracemalloc.take_snapshot()
+            self._snapshot_period = self.period * SNAPSHOT_PERIOD
+            self._snapshot_line = 0
+            self._snapshot_time = perf_counter()
+
+    def _stop(self) -> None:
+        if self.incremental and self.lines > self._snapshot_line:
+            self._take_snapshot()
         tracemalloc.stop()
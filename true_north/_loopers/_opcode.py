@@ -1,20 +1,71 @@
 from __future__ import annotations
 
+import dis
 import inspect
-import time
+import sys
 from dataclasses import dataclass, field
-from types import FrameType
-from typing import Iterator
+from time import perf_counter_ns
+from types import CodeType, FrameType
+from typing import (
+    Any, AsyncIterator, ContextManager, Counter, Dict, Iterable, Iterator,
+    List, Tuple,
+)
 
-from ._common import tracer_context
+from ._common import Monitor, Tracer, get_items, get_tool_id, is_internal
+from ._timings import Timings, TimingsBuffer
+
+
+# The number of opcodes and their total time (in ns) for each (filename, lineno).
+LineStats = Dict[Tuple[str, int], List[int]]
+
+
+def get_offsets(code: CodeType) -> dict[int, int]:
+    """Map offsets of all instructions in the code to their line numbers.
+    """
+    offsets = {}
+    for start, end, line in code.co_lines():
+        if line is not None:
+            for offset in range(start, end, 2):
+                offsets[offset] = line
+    return offsets
+
+
+def get_opnames(code: CodeType) -> dict[int, str]:
+    """Map offsets of all instructions in the code to their names.
+
+    Specialized (adaptive) instructions are reported by their generic names.
+    """
+    return {instr.offset: instr.opname for instr in dis.get_instructions(code)}
 
 
 @dataclass
 class OpcodeLooper:
+    """Iterator that counts executed opcodes and lines.
+
+    On Python 3.12+, sys.monitoring is used if `monitoring` is True,
+    which is much faster than the sys.settrace fallback.
+
+    The time (perf_counter_ns) when each opcode is executed is stored
+    in `timings`. Pass `TimingsHistogram` to keep only aggregated durations.
+
+    If `line_stats` is a dict, the number of opcodes and the time (in ns)
+    until the next opcode is recorded there for each (filename, lineno).
+
+    If `opnames` is a Counter, the number of executed instructions
+    is counted there for each opname, like LOAD_ATTR or CALL.
+    """
     loops: int
     opcodes: int = 0
     lines: int = 0
-    timings: list[float] = field(default_factory=list)
+    timings: Timings = field(default_factory=TimingsBuffer)
+    monitoring: bool = True
+    items: Iterable[Any] | None = None
+    line_stats: LineStats | None = None
+    opnames: Counter[str] | None = None
+    _line: tuple[str, int] | None = None
+    _line_time: int = 0
+    _offsets: dict[CodeType, dict[int, int]] = field(default_factory=dict)
+    _opnames: dict[CodeType, dict[int, str]] = field(default_factory=dict)
 
     def ltracer(self, frame: FrameType, event: str, arg):
         if event == 'return':
@@ -24,27 +75,110 @@ class OpcodeLooper:
             frame.f_trace_opcodes = True
             if event == 'opcode':
                 self.opcodes += 1
-                self.timings.append(time.perf_counter())
+                now = perf_counter_ns()
+                self.timings.append(now)
+                if self.line_stats is not None:
+                    self._add_line(frame.f_code, frame.f_lineno, now)
+                if self.opnames is not None:
+                    self._add_opname(frame.f_code, frame.f_lasti)
             elif event == 'line':
                 self.lines += 1
 
     def gtracer(self, frame, event: str, arg):
-        if event == 'call':
+        if event == 'call' and not is_internal(frame.f_code):
             return self.ltracer
 
+    def on_instruction(self, code: CodeType, offset: int) -> None:
+        """Callback for sys.monitoring INSTRUCTION event.
+        """
+        self.opcodes += 1
+        self.timings.append(perf_counter_ns())
+
+    def on_instruction_detailed(self, code: CodeType, offset: int) -> None:
+        """Callback for sys.monitoring INSTRUCTION event recording line stats
+        and opnames.
+        """
+        self.opcodes += 1
+        now = perf_counter_ns()
+        self.timings.append(now)
+        if self.line_stats is not None:
+            offsets = self._offsets.get(code)
+            if offsets is None:
+                offsets = get_offsets(code)
+                self._offsets[code] = offsets
+            self._add_line(code, offsets.get(offset), now)
+        if self.opnames is not None:
+            self._add_opname(code, offset)
+
+    def _add_opname(self, code: CodeType, offset: int) -> None:
+        """Count the instruction at the given offset.
+        """
+        assert self.opnames is not None
+        opnames = self._opnames.get(code)
+        if opnames is None:
+            opnames = get_opnames(code)
+            self._opnames[code] = opnames
+        self.opnames[opnames.get(offset, '<unknown>')] += 1
+
+    def _add_line(self, code: CodeType, lineno: int | None, now: int) -> None:
+        """Record an opcode for the line and the time of the previous opcode.
+
+        Some opcodes don't have a line number, they are attributed
+        to the line of the previous opcode.
+        """
+        stats = self.line_stats
+        assert stats is not None
+        if lineno is None and self._line is not None:
+            line = self._line
+        else:
+            line = (code.co_filename, lineno or code.co_firstlineno)
+        if self._line is not None:
+            stats[self._line][1] += now - self._line_time
+        entry = stats.get(line)
+        if entry is None:
+            entry = [0, 0]
+            stats[line] = entry
+        entry[0] += 1
+        self._line = line
+        self._line_time = now
+
+    def on_line(self, code: CodeType, line: int) -> None:
+        """Callback for sys.monitoring LINE event.
+        """
+        self.lines += 1
+
     def __iter__(self) -> Iterator[int]:
         frame = inspect.currentframe()
         assert frame
         frame = frame.f_back
         assert frame
+        with self._context(frame):
+            for item in get_items(self.loops, self.items):
+                yield item
 
-        frame.f_trace = self.ltracer    # trace the benchmarking function
-        frame.f_trace_opcodes = True    # enable opcode tracing
-        self.active = True
+    def __aiter__(self) -> AsyncIterator[int]:
+        # Unlike the generator in __iter__, the async generator isn't running yet,
+        # so the benchmarking function frame must be detected here.
+        frame = inspect.currentframe()
+        assert frame
+        frame = frame.f_back
+        assert frame
+        return self._aiter(frame)
 
-        with tracer_context(self.gtracer):
-            for i in range(self.loops):
-                yield i
+    async def _aiter(self, frame: FrameType) -> AsyncIterator[int]:
+        with self._context(frame):
+            for item in get_items(self.loops, self.items):
+                yield item
 
-        frame.f_trace = None
-        frame.f_trace_opcodes = False
+    def _context(self, frame: FrameType) -> ContextManager:
+        tool_id = get_tool_id() if self.monitoring else None
+        if tool_id is None:
+            return Tracer(self.gtracer, frame=frame, ltracer=self.ltracer)
+        events = sys.monitoring.events  # type: ignore[attr-defined]
+        on_instruction = self.on_instruction
+        if self.line_stats is not None or self.opnames is not None:
+            on_instruction = self.on_instruction_detailed
+        return Monitor(tool_id, frame.f_code, {
+            events.INSTRUCTION: on_instruction,
+            events.LINE: self.on_line,
+        })
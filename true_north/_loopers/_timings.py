@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import math
+import mmap
+import tempfile
+from array import array
+from typing import IO, Iterator, Union
+
+
+# How much memory (in bytes) timestamps may take before spilling to disk.
+DEFAULT_BUDGET = 64 * 1024 * 1024
+
+
+class TimingsBuffer:
+    """Compact storage for timestamps (in nanoseconds) of executed opcodes.
+
+    Timestamps are stored as 8-byte integers in an array. When the array
+    exceeds the memory budget, it is spilled into a temporary file
+    which is later read back through mmap.
+    """
+    __slots__ = ('_array', '_limit', '_file', '_spilled')
+
+    def __init__(self, budget: int = DEFAULT_BUDGET) -> None:
+        self._array = array('q')
+        self._limit = max(1, budget // self._array.itemsize)
+        self._file: IO[bytes] | None = None
+        self._spilled = 0
+
+    def append(self, timestamp: int) -> None:
+        self._array.append(timestamp)
+        if len(self._array) >= self._limit:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        self._array.tofile(self._file)
+        self._spilled += len(self._array)
+        del self._array[:]
+
+    def __len__(self) -> int:
+        return self._spilled + len(self._array)
+
+    def __iter__(self) -> Iterator[int]:
+        if self._file is not None:
+            self._file.flush()
+            with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm).cast('q')
+                try:
+                    yield from view
+                finally:
+                    view.release()
+        yield from self._array
+
+    def durations(self) -> Iterator[int]:
+        """How long it took (in nanoseconds) to execute each opcode.
+        """
+        prev: int | None = None
+        for timestamp in self:
+            if prev is not None:
+                yield timestamp - prev
+            prev = timestamp
+
+    def histogram(self, limit: int) -> list[float]:
+        """Split durations into `limit` chunks and get the average for each.
+        """
+        size = math.ceil((len(self) - 1) / limit)
+        bars = []
+        total = 0
+        count = 0
+        for duration in self.durations():
+            total += duration
+            count += 1
+            if count == size:
+                bars.append(total / count)
+                total = 0
+                count = 0
+        if count:
+            bars.append(total / count)
+        return bars
+
+
+class TimingsHistogram:
+    """Aggregates durations of executed opcodes into buckets while streaming.
+
+    Individual timestamps are not stored. Each bucket holds the sum and number
+    of consecutive durations. When all buckets are filled, each pair of adjacent
+    buckets is merged into one, doubling the number of durations per bucket.
+    So, the memory used is fixed, no matter how many opcodes are executed.
+    """
+    __slots__ = ('_capacity', '_width', '_sums', '_counts', '_prev', '_count')
+
+    def __init__(self, buckets: int = 64) -> None:
+        self._capacity = buckets * 2
+        self._width = 1
+        self._sums: list[int] = []
+        self._counts: list[int] = []
+        self._prev = 0
+        self._count = 0
+
+    def append(self, timestamp: int) -> None:
+        prev = self._prev
+        self._prev = timestamp
+        self._count += 1
+        if self._count == 1:
+            return
+        if self._counts and self._counts[-1] < self._width:
+            self._sums[-1] += timestamp - prev
+            self._counts[-1] += 1
+            return
+        if len(self._sums) == self._capacity:
+            self._merge()
+        self._sums.append(timestamp - prev)
+        self._counts.append(1)
+
+    @classmethod
+    def from_bars(cls, bars: list[float]) -> TimingsHistogram:
+        """Restore the histogram from the average durations of its buckets.
+        """
+        result = cls(buckets=max(1, len(bars)))
+        result._sums = [round(bar) for bar in bars]
+        result._counts = [1 for _ in bars]
+        result._count = len(bars) + 1
+        return result
+
+    def _merge(self) -> None:
+        self._sums = [a + b for a, b in zip(self._sums[::2], self._sums[1::2])]
+        self._counts = [a + b for a, b in zip(self._counts[::2], self._counts[1::2])]
+        self._width *= 2
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[int]:
+        """Timestamps rebuilt from `durations`, starting from 0.
+        """
+        if not self._count:
+            return
+        timestamp = 0
+        yield timestamp
+        for duration in self.durations():
+            timestamp += duration
+            yield timestamp
+
+    def durations(self) -> Iterator[int]:
+        """Durations rebuilt from buckets, each one as the average of its bucket.
+
+        Individual durations aren't recorded, so they are approximated
+        but their number and the total are the same as of the recorded ones.
+        """
+        for total, count in zip(self._sums, self._counts):
+            average, extra = divmod(total, count)
+            for i in range(count):
+                yield average + (i < extra)
+
+    def histogram(self, limit: int) -> list[float]:
+        """Merge buckets into at most `limit` chunks and get the average for each.
+        """
+        if not self._sums:
+            return []
+        size = math.ceil(len(self._sums) / limit)
+        bars = []
+        for i in range(0, len(self._sums), size):
+            total = sum(self._sums[i:i + size])
+            count = sum(self._counts[i:i + size])
+            bars.append(total / count)
+        return bars
+
+
+Timings = Union[TimingsBuffer, TimingsHistogram]
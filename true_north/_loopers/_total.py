@@ -1,22 +1,65 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterable, Iterator
 
-from ._common import Timer
+from .._rusage import get_usage, get_usage_diff
+from ._common import Timer, get_items
+
+
+if TYPE_CHECKING:
+    from .._perf import Counters
 
 
 @dataclass
 class TotalLooper:
     """Iterator that tracks the total execution time.
+
+    Supports both `for` and `async for`.
+    If `items` are specified, they are yielded instead of loop numbers.
+
+    If `counters` are specified, hardware counters are enabled
+    only while the loops are running and their values are stored in `counts`.
+
+    The resource usage (CPU time, page faults, context switches) of the loops
+    is stored in `usage`. It's recorded outside of the timed section.
     """
     loops: int
     timer: Timer
     start: float = 0
     stop: float = 0
+    items: Iterable[Any] | None = None
+    counters: Counters | None = None
+    counts: dict[str, int] = field(default_factory=dict)
+    usage: dict[str, float] = field(default_factory=dict)
 
     def __iter__(self) -> Iterator[int]:
+        items = get_items(self.loops, self.items)
+        counters = self.counters
+        usage = get_usage()
+        if counters is not None:
+            counters.start()
+        self.start = self.timer()
+        for item in items:
+            yield item
+        self.stop = self.timer()
+        if counters is not None:
+            self.counts = counters.stop()
+        self.usage = get_usage_diff(usage, get_usage())
+
+    def __aiter__(self) -> AsyncIterator[int]:
+        return self._aiter()
+
+    async def _aiter(self) -> AsyncIterator[int]:
+        items = get_items(self.loops, self.items)
+        counters = self.counters
+        usage = get_usage()
+        if counters is not None:
+            counters.start()
         self.start = self.timer()
-        for i in range(self.loops):
-            yield i
+        for item in items:
+            yield item
         self.stop = self.timer()
+        if counters is not None:
+            self.counts = counters.stop()
+        self.usage = get_usage_diff(usage, get_usage())
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+def get_cpus() -> list[int]:
+    """CPU cores available for the current process.
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def pin_worker(counter, cpus: list[int]) -> None:
+    """Pin the current worker process to its own CPU core.
+
+    The counter is shared between all workers of the pool,
+    so each worker takes the next free core.
+    """
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+
+def run_file(path: Path, args: argparse.Namespace) -> tuple[str, str]:
+    """Run all groups from the file and return the output.
+
+    Returns the human-friendly output and the NDJSON records.
+    """
+    from ._cli import run_all_groups
+    stream = StringIO()
+    output = StringIO() if args.output is not None else None
+    run_all_groups(path, args=args, stdout=stream, output=output)
+    records = output.getvalue() if output is not None else ''
+    return stream.getvalue(), records
+
+
+def run_parallel(
+    paths: Iterable[Path],
+    args: argparse.Namespace,
+    jobs: int,
+) -> Iterator[tuple[str, str]]:
+    """Run files in a pool of worker processes.
+
+    Each worker is pinned to a separate CPU core. The output of each file
+    is yielded in the same order as the paths are passed.
+    """
+    cpus = get_cpus()
+    counter = multiprocessing.Value('i', 0)
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(cpus)),
+        initializer=pin_worker,
+        initargs=(counter, cpus),
+    ) as executor:
+        futures = [executor.submit(run_file, path, args) for path in paths]
+        for future in futures:
+            yield future.result()
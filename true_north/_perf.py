@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import os
+import platform
+import struct
+import sys
+
+
+# perf_event_open syscall number for each architecture.
+SYSCALLS = {
+    'x86_64': 298,
+    'aarch64': 241,
+    'arm64': 241,
+}
+
+PERF_TYPE_HARDWARE = 0
+# Hardware events to count: (name, config).
+EVENTS = (
+    ('instructions', 1),
+    ('cycles', 0),
+    ('cache_misses', 3),
+    ('branch_misses', 5),
+)
+
+PERF_ATTR_SIZE = 64
+PERF_FORMAT_GROUP = 1 << 3
+# perf_event_attr flags
+DISABLED = 1 << 0
+EXCLUDE_KERNEL = 1 << 5
+EXCLUDE_HV = 1 << 6
+PERF_FLAG_FD_CLOEXEC = 1 << 3
+
+PERF_EVENT_IOC_ENABLE = 0x2400
+PERF_EVENT_IOC_DISABLE = 0x2401
+PERF_EVENT_IOC_RESET = 0x2403
+PERF_IOC_FLAG_GROUP = 1
+
+
+def _make_attr(config: int) -> bytes:
+    """Pack perf_event_attr struct (the first version of it, 64 bytes).
+
+    Only user-space events are counted, so that it works
+    with the default perf_event_paranoid=2.
+    """
+    return struct.pack(
+        '<IIQQQQQIIQ',
+        PERF_TYPE_HARDWARE,     # type
+        PERF_ATTR_SIZE,         # size
+        config,                 # config
+        0,                      # sample_period
+        0,                      # sample_type
+        PERF_FORMAT_GROUP,      # read_format
+        DISABLED | EXCLUDE_KERNEL | EXCLUDE_HV,  # flags
+        0,                      # wakeup_events
+        0,                      # bp_type
+        0,                      # config1
+    )
+
+
+class Counters:
+    """Hardware performance counters of the current thread (Linux only).
+
+    All events are opened as a single group, so they are always
+    scheduled together and read at once.
+
+    Raises OSError if counters are not available. Events not supported
+    by the CPU (or the virtual machine) are skipped.
+    """
+    __slots__ = ('_libc', '_fds', '_names')
+
+    def __init__(self) -> None:
+        if not sys.platform.startswith('linux'):
+            raise OSError('perf events are available only on Linux')
+        syscall = SYSCALLS.get(platform.machine())
+        if syscall is None:
+            raise OSError(f'unsupported architecture: {platform.machine()}')
+        try:
+            import ctypes
+        except ImportError as exc:
+            raise OSError('ctypes is not available') from exc
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fds: list[int] = []
+        self._names: list[str] = []
+        error = 0
+        for name, config in EVENTS:
+            group_fd = self._fds[0] if self._fds else -1
+            fd = self._libc.syscall(
+                syscall,
+                ctypes.c_char_p(_make_attr(config)),
+                0,          # pid: the current thread
+                -1,         # cpu: any
+                group_fd,
+                PERF_FLAG_FD_CLOEXEC,
+            )
+            if fd < 0:
+                error = ctypes.get_errno()
+                continue
+            self._fds.append(fd)
+            self._names.append(name)
+        if not self._fds:
+            raise OSError(error, f'perf_event_open failed: {os.strerror(error)}')
+
+    @property
+    def names(self) -> list[str]:
+        """Names of events that are counted.
+        """
+        return self._names
+
+    def start(self) -> None:
+        """Reset and enable all counters.
+        """
+        leader = self._fds[0]
+        self._libc.ioctl(leader, PERF_EVENT_IOC_RESET, PERF_IOC_FLAG_GROUP)
+        self._libc.ioctl(leader, PERF_EVENT_IOC_ENABLE, PERF_IOC_FLAG_GROUP)
+
+    def stop(self) -> dict[str, int]:
+        """Disable all counters and read their values.
+        """
+        leader = self._fds[0]
+        self._libc.ioctl(leader, PERF_EVENT_IOC_DISABLE, PERF_IOC_FLAG_GROUP)
+        size = 8 * (len(self._fds) + 1)
+        data = os.read(leader, size)
+        count, *values = struct.unpack(f'<{len(data) // 8}Q', data)
+        return dict(zip(self._names[:count], values))
+
+    def close(self) -> None:
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def __enter__(self) -> Counters:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import shutil
+from time import perf_counter
+from typing import TextIO
+
+
+# How often (in seconds) the progress line can be redrawn.
+REFRESH_INTERVAL = .1
+
+
+def format_eta(seconds: float) -> str:
+    """Represent the remaining time as a short text, like "4.2s" or "1h 5m".
+    """
+    if seconds < 60:
+        return f'{seconds:.1f}s'
+    minutes, seconds = divmod(round(seconds), 60)
+    if minutes < 60:
+        return f'{minutes}m {seconds}s'
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h {minutes}m'
+
+
+class Progress:
+    """The line showing what is being measured and how long it will take.
+
+    It's drawn into a separate stream (stderr) and only between measurements,
+    never from inside of a timed loop. When the stream is a terminal, the line
+    is redrawn in place, at most once per `REFRESH_INTERVAL`. Otherwise,
+    like in CI logs, a new line is written only when the phase changes.
+
+    If `stream` is None, nothing is drawn, so that the code doing measurements
+    can report the progress without checking if it's enabled.
+    A phase can be used as a context manager clearing the line when done:
+
+        with progress.phase('memory'):
+            ...
+    """
+    __slots__ = (
+        '_stream', '_tty', '_group', '_check', '_phase', '_total', '_done',
+        '_estimate', '_deadline', '_started', '_drawn', '_last_draw',
+    )
+
+    _stream: TextIO | None
+    _tty: bool
+    _group: str
+    _check: str
+    _phase: str
+    _total: int
+    _done: int
+    _estimate: float | None
+    _deadline: float | None
+    _started: float
+    _drawn: bool
+    _last_draw: float
+
+    def __init__(self, stream: TextIO | None = None) -> None:
+        self._stream = stream
+        isatty = getattr(stream, 'isatty', None)
+        self._tty = bool(isatty and isatty())
+        self._group = ''
+        self._check = ''
+        self._phase = ''
+        self._total = 0
+        self._done = 0
+        self._estimate = None
+        self._deadline = None
+        self._started = 0
+        self._drawn = False
+        self._last_draw = 0
+
+    def start(self, group: str, check: str) -> None:
+        """Start showing the progress of the check.
+        """
+        self._group = group
+        self._check = check
+        self._phase = ''
+
+    def phase(
+        self,
+        name: str,
+        total: int = 0,
+        estimate: float | None = None,
+        deadline: float | None = None,
+    ) -> Progress:
+        """Start a new phase of the check and show it right away.
+
+        If the phase consists of `total` steps, the ETA is based on how
+        long the already done steps took or, before the first step is done,
+        on `estimate` (the expected duration of a single step). The ETA is
+        never later than `deadline` (in `perf_counter` seconds).
+        """
+        self._phase = name
+        self._total = total
+        self._done = 0
+        self._estimate = estimate
+        self._deadline = deadline
+        self._started = perf_counter()
+        self._draw()
+        return self
+
+    def __enter__(self) -> Progress:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.clear()
+
+    def step(self) -> None:
+        """Mark one more step of the current phase as done.
+        """
+        self._done += 1
+        if not self._tty:
+            return
+        if perf_counter() - self._last_draw >= REFRESH_INTERVAL:
+            self._draw()
+
+    @property
+    def eta(self) -> float | None:
+        """How many seconds are left until the current phase is done.
+        """
+        if not self._total:
+            return None
+        now = perf_counter()
+        per_step = self._estimate
+        if self._done:
+            per_step = (now - self._started) / self._done
+        if per_step is None:
+            return None
+        eta = per_step * max(0, self._total - self._done)
+        if self._deadline is not None:
+            eta = max(0, min(eta, self._deadline - now))
+        return eta
+
+    def format_text(self) -> str:
+        result = f'{self._group} / {self._check}'
+        if self._phase:
+            result += f': {self._phase}'
+        if self._total:
+            result += f' {self._done}/{self._total}'
+        eta = self.eta
+        if eta is not None:
+            result += f', ETA {format_eta(eta)}'
+        return result
+
+    def _draw(self) -> None:
+        if self._stream is None:
+            return
+        text = self.format_text()
+        if self._tty:
+            # a line longer than the terminal wraps and can't be erased
+            width = shutil.get_terminal_size().columns - 1
+            self._stream.write(f'\r\x1b[K{text[:width]}')
+        else:
+            self._stream.write(f'{text}\n')
+        self._stream.flush()
+        self._drawn = self._tty
+        self._last_draw = perf_counter()
+
+    def clear(self) -> None:
+        """Erase the progress line, so that results can be printed.
+        """
+        if not self._drawn or self._stream is None:
+            return
+        self._stream.write('\r\x1b[K')
+        self._stream.flush()
+        self._drawn = False
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, TextIO
+
+from ._environment import get_environment
+from ._results import (
+    BaseResult, ComplexityResult, LinesResult, MallocResult, MemoryResult,
+    OpcodesResult, ScalingResult, TimingResult,
+)
+
+
+@dataclass
+class Report:
+    """All results collected for a single check.
+    """
+    group: str
+    check: str
+    timing: TimingResult
+    memory: MemoryResult | None = None
+    opcodes: OpcodesResult | None = None
+    mallocs: MallocResult | None = None
+    scaling: ScalingResult | None = None
+    complexity: ComplexityResult | None = None
+    hot_lines: LinesResult | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Represent the report as a JSON-serializable dict.
+        """
+        result: dict[str, Any] = dict(
+            group=self.group,
+            check=self.check,
+            timing=self.timing.to_dict(),
+        )
+        if self.memory is not None:
+            result['memory'] = self.memory.to_dict()
+        if self.opcodes is not None:
+            result['opcodes'] = self.opcodes.to_dict()
+        if self.mallocs is not None:
+            result['mallocs'] = self.mallocs.to_dict()
+        if self.scaling is not None:
+            result['scaling'] = self.scaling.to_dict()
+        if self.complexity is not None:
+            result['complexity'] = self.complexity.to_dict()
+        if self.hot_lines is not None:
+            result['hot_lines'] = self.hot_lines.to_dict()
+        result['env'] = get_environment()
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Report:
+        """Restore the report from the dict produced by `to_dict`.
+        """
+        report = cls(
+            group=data['group'],
+            check=data['check'],
+            timing=TimingResult.from_dict(data['timing']),
+        )
+        if 'memory' in data:
+            report.memory = MemoryResult.from_dict(data['memory'])
+        if 'opcodes' in data:
+            report.opcodes = OpcodesResult.from_dict(data['opcodes'])
+        if 'mallocs' in data:
+            report.mallocs = MallocResult.from_dict(data['mallocs'])
+        if 'scaling' in data:
+            report.scaling = ScalingResult.from_dict(data['scaling'])
+        if 'complexity' in data:
+            report.complexity = ComplexityResult.from_dict(data['complexity'])
+            report.timing = report.complexity.timings[-1]
+        if 'hot_lines' in data:
+            report.hot_lines = LinesResult.from_dict(data['hot_lines'])
+        return report
+
+    def print(self, stream: TextIO, histogram_lines: int | None = None) -> None:
+        """Print all results in the same way as they are printed when measured.
+        """
+        results: list[BaseResult] = [self.complexity or self.timing]
+        if self.memory is not None:
+            results.append(self.memory)
+        if self.opcodes is not None:
+            results.append(self.opcodes)
+        if self.mallocs is not None:
+            results.append(self.mallocs)
+        if self.scaling is not None:
+            results.append(self.scaling)
+        if self.hot_lines is not None:
+            results.append(self.hot_lines)
+        for result in results:
+            result.print(stream=stream, histogram_lines=histogram_lines)
+
+    def write(self, stream: TextIO) -> None:
+        """Write the report into the stream as a single line of JSON (NDJSON).
+        """
+        stream.write(json.dumps(self.to_dict()) + '\n')
+        stream.flush()
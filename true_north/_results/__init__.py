@@ -1,12 +1,20 @@
 from ._base import BaseResult
+from ._complexity import ComplexityResult
+from ._lines import LinesResult
 from ._malloc import MallocResult
+from ._memory import MemoryResult
 from ._opcodes import OpcodesResult
+from ._scaling import ScalingResult
 from ._timing import TimingResult
 
 
 __all__ = [
     'BaseResult',
+    'ComplexityResult',
+    'LinesResult',
     'MallocResult',
+    'MemoryResult',
     'OpcodesResult',
+    'ScalingResult',
     'TimingResult',
 ]
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
 import sys
-from typing import TextIO
+from typing import Any, TextIO, TypeVar
 
 from ._formatters import TICKS
 
 
+R = TypeVar('R', bound='BaseResult')
+
+
 class BaseResult:
     __slots__ = ()
 
@@ -34,3 +37,14 @@ class BaseResult:
 
     def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
         raise NotImplementedError
+
+    def to_dict(self) -> dict[str, Any]:
+        """Represent the result as a JSON-serializable dict.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def from_dict(cls: type[R], data: dict[str, Any]) -> R:
+        """Restore the result from the dict produced by `to_dict`.
+        """
+        raise NotImplementedError
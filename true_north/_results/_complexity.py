@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .._colors import colors
+from .._stats import Fit, fit_complexity
+from ._base import BaseResult
+from ._formatters import format_time, make_histogram
+from ._timing import TimingResult
+
+
+# If the relative error of the best fit is more than that, warn about it.
+MAX_FIT_ERROR = .1
+
+
+class ComplexityResult(BaseResult):
+    """The result of running a benchmark for different input sizes.
+    """
+    __slots__ = ('_sizes', '_timings', '_fits')
+
+    _sizes: list[int]
+    _timings: list[TimingResult]
+    _fits: list[Fit] | None
+
+    def __init__(self, sizes: list[int], timings: list[TimingResult]) -> None:
+        assert len(sizes) == len(timings)
+        self._sizes = sizes
+        self._timings = timings
+        self._fits = None
+
+    @property
+    def sizes(self) -> list[int]:
+        """Input sizes the benchmark was executed with.
+        """
+        return self._sizes
+
+    @property
+    def timings(self) -> list[TimingResult]:
+        """The timing result for each input size.
+        """
+        return self._timings
+
+    @property
+    def fits(self) -> list[Fit]:
+        """How well timings fit each complexity class, the best fit first.
+        """
+        if self._fits is None:
+            times = [t.best for t in self._timings]
+            self._fits = fit_complexity(self._sizes, times)
+        return self._fits
+
+    @property
+    def best_fit(self) -> Fit:
+        """The complexity class that describes the timings the best.
+        """
+        return self.fits[0]
+
+    def format_text(self) -> str:
+        """Represent the result as a human-friendly text.
+
+        One line for each size with the best time, and the best fit at the end.
+        """
+        lines = []
+        width = max(len(str(size)) for size in self._sizes)
+        for size, timing in zip(self._sizes, self._timings):
+            line = 'n={size} {best}'.format(
+                size=colors.cyan(size, rjust=width),
+                best=format_time(timing.best),
+            )
+            lines.append(line)
+        fit = self.best_fit
+        unit = fit.name[2:-1]
+        line = '{name} {coef}'.format(
+            name=colors.green(fit.name),
+            coef=format_time(fit.coef),
+        )
+        if unit != '1':
+            line += f' × {unit}'
+        lines.append(line)
+        return '\n    '.join(lines)
+
+    def format_warnings(self) -> list[str]:
+        result = []
+        if len(self._sizes) < 3:
+            msg = 'Too few sizes to reliably detect the complexity.'
+            result.append(colors.red(msg))
+        elif self.best_fit.rms > MAX_FIT_ERROR:
+            msg = 'The timings do not fit well into any complexity class.'
+            result.append(colors.red(msg))
+        return result
+
+    def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
+        """Histogram of the best times for each input size.
+        """
+        times = [t.best for t in self._timings[:limit]]
+        return colors.cyan(make_histogram(times, lines=lines))
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            sizes=self._sizes,
+            timings=[t.to_dict() for t in self._timings],
+            fits=[fit.to_dict() for fit in self.fits],
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ComplexityResult:
+        return cls(
+            sizes=data['sizes'],
+            timings=[TimingResult.from_dict(t) for t in data['timings']],
+        )
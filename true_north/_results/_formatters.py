@@ -16,7 +16,7 @@ TICKS = '▁▂▃▄▅▆▇█'
 
 
 def chunks(items: list, count: int) -> Iterator[list]:
-    size = math.ceil(len(items) / count)
+    size = max(1, math.ceil(len(items) / count))
     for i in range(0, len(items), size):
         yield items[i:i + size]
 
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import linecache
+import os
+from typing import Any
+
+from .._colors import colors
+from .._loopers import LineStats
+from ._base import BaseResult
+from ._formatters import format_time, make_histogram
+
+
+class LinesResult(BaseResult):
+    """The result of profiling how much time each line of code takes.
+
+    The time of each line includes only its own opcodes and C functions
+    they call but not the python functions called from it.
+    """
+    __slots__ = ('_stats', '_top')
+
+    _stats: LineStats
+    _top: int
+
+    def __init__(self, stats: LineStats, top: int = 10) -> None:
+        self._stats = stats
+        self._top = top
+
+    @property
+    def stats(self) -> LineStats:
+        """The number of opcodes and their time (in ns) for each (filename, lineno).
+        """
+        return self._stats
+
+    @property
+    def hot_lines(self) -> list[tuple[str, int, int, int]]:
+        """All lines as (filename, lineno, opcodes, ns), the slowest first.
+        """
+        lines = []
+        for (fname, lineno), (ops, ns) in self._stats.items():
+            lines.append((fname, lineno, ops, ns))
+        lines.sort(key=lambda line: line[3], reverse=True)
+        return lines
+
+    @property
+    def total_time(self) -> int:
+        """The total time of all lines in nanoseconds.
+        """
+        return sum(ns for _, ns in self._stats.values())
+
+    def format_text(self) -> str:
+        """Represent the top slowest lines as a human-friendly text.
+
+        One line for each hot line with its share of the total time,
+        the total time, opcodes count, location, and source code.
+        """
+        total = self.total_time
+        lines = []
+        for fname, lineno, ops, ns in self.hot_lines[:self._top]:
+            share = ns / total if total else 0
+            source = linecache.getline(fname, lineno).strip()
+            line = '{share} {time} {ops} ops {location} {source}'.format(
+                share=colors.red(f'{share:.1%}', rjust=6),
+                time=format_time(ns / 1e9),
+                ops=colors.cyan(ops, rjust=10, group=True),
+                location=colors.blue(f'{os.path.basename(fname)}:{lineno}'),
+                source=source,
+            )
+            lines.append(line)
+        return '\n    '.join(lines)
+
+    def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
+        """Histogram of times of the slowest lines.
+        """
+        times = [line[3] for line in self.hot_lines[:limit]]
+        return colors.red(make_histogram(times, lines=lines))
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            top=self._top,
+            lines=[
+                dict(file=fname, line=lineno, opcodes=ops, ns=ns)
+                for fname, lineno, ops, ns in self.hot_lines
+            ],
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> LinesResult:
+        stats = {}
+        for line in data['lines']:
+            stats[line['file'], line['line']] = [line['opcodes'], line['ns']]
+        return cls(stats=stats, top=data['top'])
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import math
 from collections import Counter
+from typing import Any
 
 from .._colors import colors
 from ._base import BaseResult
@@ -44,10 +45,25 @@ class MallocResult(BaseResult):
         """
         return '    {allocs} allocs {used} used {samples} samples'.format(
             allocs=colors.magenta(self.total_allocs, group=True, rjust=12),
-            used=format_size(max(self._totals), rjust=5),
+            # no samples if the benchmark executed no lines
+            used=format_size(max(self._totals, default=0), rjust=5),
             samples=colors.magenta(len(self._totals), rjust=9),
         )
 
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            total_allocs=self.total_allocs,
+            totals=self._totals,
+            allocs=[dict(alloc) for alloc in self._allocs],
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MallocResult:
+        return cls(
+            totals=data['totals'],
+            allocs=[Counter(alloc) for alloc in data['allocs']],
+        )
+
     def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
         bars = []
         for chunk in chunks(self._totals, limit):
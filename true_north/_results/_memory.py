@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any
+
+from .._colors import colors
+from ._base import BaseResult
+from ._formatters import format_size, make_histogram
+
+
+class MemoryResult(BaseResult):
+    """The result of measuring peak memory usage of a code.
+
+    Unlike `MallocResult`, it doesn't trace lines, only the total memory
+    allocated by Python, so it's cheap enough to run on every CI run.
+    """
+    __slots__ = ('_peaks', '_nets', '_rss')
+
+    _peaks: list[int]
+    _nets: list[int]
+    _rss: int | None
+
+    def __init__(
+        self,
+        peaks: list[int],
+        nets: list[int],
+        rss: int | None = None,
+    ) -> None:
+        self._peaks = peaks
+        self._nets = nets
+        self._rss = rss
+
+    @property
+    def peaks(self) -> list[int]:
+        """The peak traced memory (in bytes) in each repeat above what it was before.
+        """
+        return self._peaks
+
+    @property
+    def nets(self) -> list[int]:
+        """Traced memory (in bytes) still allocated after each repeat.
+
+        It's the memory the benchmark doesn't release: caches and leaks.
+        """
+        return self._nets
+
+    @property
+    def rss(self) -> int | None:
+        """How much (in bytes) the peak resident set size of the process grew.
+
+        The peak RSS never goes down, so it's 0 if the process already used
+        more memory before. None if the platform doesn't provide it.
+        """
+        return self._rss
+
+    @property
+    def peak(self) -> int:
+        """The highest peak of all repeats.
+        """
+        return max(self._peaks)
+
+    @property
+    def net(self) -> int:
+        """The lowest net memory of all repeats.
+
+        Caches are filled only in the first repeat but leaks show up in all.
+        """
+        return min(self._nets)
+
+    def format_text(self) -> str:
+        """Represent the memory usage as a human-friendly text.
+        """
+        result = '{peak} peak {net} net'.format(
+            peak=format_size(self.peak, rjust=5),
+            net=format_size(self.net, rjust=5),
+        )
+        if self._rss is not None:
+            result += f' {format_size(self._rss, rjust=5)} peak RSS growth'
+        return result
+
+    def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
+        """Histogram of peak memory in each repeat.
+        """
+        return colors.magenta(make_histogram(self._peaks[:limit], lines=lines))
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            peak=self.peak,
+            net=self.net,
+            peaks=self._peaks,
+            nets=self._nets,
+            rss=self._rss,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MemoryResult:
+        return cls(
+            peaks=data['peaks'],
+            nets=data['nets'],
+            rss=data['rss'],
+        )
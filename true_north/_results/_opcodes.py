@@ -2,34 +2,47 @@
 
 from __future__ import annotations
 
-import math
+from collections import Counter
+from typing import Any
 
 from .._colors import colors
+from .._loopers import Timings, TimingsHistogram
 from ._base import BaseResult
-from ._formatters import chunks, make_histogram
+from ._formatters import make_histogram
+
+
+# How many bars of the opcode durations histogram to export.
+HISTOGRAM_LIMIT = 64
+# How many opnames to show in the output.
+OPNAMES_LIMIT = 6
 
 
 class OpcodesResult(BaseResult):
     """The result of benchmarking opcodes executed by a code.
     """
-    __slots__ = ('_opcodes', '_lines', '_timings', '_best')
+    __slots__ = ('_opcodes', '_lines', '_timings', '_best', '_opnames', '_base')
 
     _opcodes: int
     _lines: int
-    _timings: list[float]
+    _timings: Timings
     _best: float
+    _opnames: Counter[str] | None
+    _base: OpcodesResult | None
 
     def __init__(
         self,
         opcodes: int,
         lines: int,
-        timings: list[float],
+        timings: Timings,
         best: float,
+        opnames: Counter[str] | None = None,
     ) -> None:
         self._opcodes = opcodes
         self._lines = lines
         self._timings = timings
         self._best = best
+        self._opnames = opnames
+        self._base = None
 
     @property
     def opcodes_count(self) -> int:
@@ -47,30 +60,93 @@ class OpcodesResult(BaseResult):
 
     @property
     def timings(self) -> list[float]:
-        """The time when each opcode was executed.
+        """The time (in seconds) when each opcode was executed.
+
+        If opcodes were traced in the histogram mode (which `Check.print` uses),
+        the time is approximated from aggregated durations and starts from 0.
         """
-        return self._timings
+        return [timestamp / 1e9 for timestamp in self._timings]
+
+    @property
+    def opnames(self) -> Counter[str] | None:
+        """How many times each instruction (like LOAD_ATTR) was executed.
+
+        None if instructions were not counted by name.
+        """
+        return self._opnames
+
+    def diff(self, base: OpcodesResult) -> Counter[str]:
+        """How many more (or fewer) instructions of each kind were executed than in base.
+
+        Instructions executed the same number of times are not included.
+        """
+        assert self._opnames is not None
+        assert base._opnames is not None
+        result: Counter[str] = Counter()
+        for name in self._opnames.keys() | base._opnames.keys():
+            delta = self._opnames[name] - base._opnames[name]
+            if delta:
+                result[name] = delta
+        return result
 
     @property
     def durations(self) -> list[float]:
-        """How long it took to execute each opcode.
+        """How long (in seconds) it took to execute each opcode.
+
+        If opcodes were traced in the histogram mode (which `Check.print` uses),
+        each duration is the average duration of opcodes around it.
         """
-        diffs = []
-        for left, right in zip(self._timings, self._timings[1:]):
-            diffs.append(right - left)
-        return diffs
+        return [duration / 1e9 for duration in self._timings.durations()]
 
     def format_text(self) -> str:
         """Generate a human-friendly representation of opcodes.
         """
-        return '    {opcodes} ops {ns_op} ns/op {lines} lines'.format(
+        ns_op = 0
+        if self._opcodes:
+            ns_op = int(self._best * 1e9 // self._opcodes)
+        result = '    {opcodes} ops {ns_op} ns/op {lines} lines'.format(
             opcodes=colors.cyan(self._opcodes, rjust=12, group=True),
-            ns_op=colors.cyan(int(self._best * 1e9 // self._opcodes), rjust=8),
+            ns_op=colors.cyan(ns_op, rjust=8),
             lines=colors.cyan(self._lines, rjust=12, group=True),
         )
+        if self._opnames is None:
+            return result
+        lines = [result]
+        top = self._opnames.most_common(OPNAMES_LIMIT)
+        lines.append('  '.join(f'{name} {colors.cyan(count)}' for name, count in top))
+        if self._base is not None and self._base._opnames is not None:
+            diff = self.diff(self._base)
+            top = sorted(diff.items(), key=lambda item: (-abs(item[1]), item[0]))
+            changes = []
+            for name, delta in top[:OPNAMES_LIMIT]:
+                color = colors.red if delta > 0 else colors.green
+                changes.append(f'{name} {color(f"{delta:+}")}')
+            lines.append('vs base: ' + ('  '.join(changes) or 'same'))
+        return '\n        '.join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        result = dict(
+            opcodes=self._opcodes,
+            lines=self._lines,
+            best=self._best,
+            histogram=self._timings.histogram(HISTOGRAM_LIMIT),
+        )
+        if self._opnames is not None:
+            result['opnames'] = dict(self._opnames)
+        if self._base is not None and self._base._opnames is not None:
+            result['opnames_diff'] = dict(self.diff(self._base))
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> OpcodesResult:
+        return cls(
+            opcodes=data['opcodes'],
+            lines=data['lines'],
+            timings=TimingsHistogram.from_bars(data['histogram']),
+            best=data['best'],
+            opnames=Counter(data['opnames']) if 'opnames' in data else None,
+        )
 
     def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
-        bars = []
-        for chunk in chunks(self.durations, limit):
-            bars.append(math.fsum(chunk) / len(chunk))
+        bars = self._timings.histogram(limit)
         return colors.cyan(make_histogram(bars, lines=lines))
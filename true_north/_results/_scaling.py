@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+from .._colors import colors
+from ._base import BaseResult
+from ._formatters import format_amount, format_time, make_histogram
+
+
+class ScalingResult(BaseResult):
+    """The result of running a benchmark concurrently in multiple threads.
+    """
+    __slots__ = ('_threads', '_walls', '_latencies', '_loops', '_base')
+
+    _threads: list[int]
+    _walls: list[float]
+    _latencies: list[list[float]]
+    _loops: int
+    _base: float
+
+    def __init__(
+        self,
+        threads: list[int],
+        walls: list[float],
+        latencies: list[list[float]],
+        loops: int,
+        base: float,
+    ) -> None:
+        self._threads = threads
+        self._walls = walls
+        self._latencies = latencies
+        self._loops = loops
+        self._base = base
+
+    @property
+    def threads(self) -> list[int]:
+        """The number of threads for each run.
+        """
+        return self._threads
+
+    @property
+    def walls(self) -> list[float]:
+        """The time from the first thread starting loops to the last one finishing.
+        """
+        return self._walls
+
+    @property
+    def throughputs(self) -> list[float | None]:
+        """How many loops per second all threads together executed on each run.
+
+        None if the run was too fast for the timer to measure.
+        """
+        result: list[float | None] = []
+        for threads, wall in zip(self._threads, self._walls):
+            result.append(threads * self._loops / wall if wall > 0 else None)
+        return result
+
+    @property
+    def latencies(self) -> list[float]:
+        """The average time per loop in a single thread on each run.
+        """
+        return [math.fsum(ts) / len(ts) for ts in self._latencies]
+
+    @property
+    def efficiencies(self) -> list[float | None]:
+        """How well the benchmark scales compared to the single-thread timing.
+
+        1.0 means that N threads do N times more work than one thread.
+        None if either the run or the single-thread timing is too fast to measure.
+        """
+        if self._base <= 0:
+            return [None for _ in self._threads]
+        base = 1 / self._base
+        return [
+            None if t is None else t / (n * base)
+            for n, t in zip(self._threads, self.throughputs)
+        ]
+
+    def format_text(self) -> str:
+        """Represent the scaling as a human-friendly text, one line per run.
+        """
+        lines = []
+        runs = zip(self._threads, self.throughputs, self.latencies, self.efficiencies)
+        for threads, throughput, latency, efficiency in runs:
+            if efficiency is None:
+                efficiency_text = colors.yellow('n/a', rjust=5)
+            else:
+                color = colors.green if efficiency >= .5 else colors.red
+                efficiency_text = color(f'{efficiency:.0%}', rjust=5)
+            throughput_text = 'n/a'
+            if throughput is not None:
+                throughput_text = format_amount(throughput)
+            line = '{threads} threads {throughput} loops/s {latency} {efficiency}'
+            lines.append(line.format(
+                threads=colors.cyan(threads, rjust=4),
+                throughput=throughput_text.rjust(5),
+                latency=format_time(latency),
+                efficiency=efficiency_text,
+            ))
+        return '\n    '.join(lines)
+
+    def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
+        """Histogram of scaling efficiencies.
+        """
+        efficiencies = [e or 0 for e in self.efficiencies[:limit]]
+        return colors.cyan(make_histogram(efficiencies, lines=lines))
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            threads=self._threads,
+            throughputs=self.throughputs,
+            latencies=self.latencies,
+            efficiencies=self.efficiencies,
+            walls=self._walls,
+            loops=self._loops,
+            base=self._base,
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> ScalingResult:
+        return cls(
+            threads=data['threads'],
+            walls=data['walls'],
+            latencies=[[latency] for latency in data['latencies']],
+            loops=data['loops'],
+            base=data['base'],
+        )
@@ -1,29 +1,94 @@
 from __future__ import annotations
 
 import math
+from statistics import median
+from typing import Any
 
+from .._calibration import Overhead
 from .._colors import colors
+from .._stats import Comparison, compare, find_warmup
 from ._base import BaseResult
-from ._formatters import format_amount, format_time, make_histogram
+from ._formatters import chunks, format_amount, format_time, make_histogram
+
+
+# If the best time is less than that many measurement floors, warn about it.
+NEAR_FLOOR = 10
+# How many repeats each result must have to be compared by them.
+# Otherwise, loop timings are compared.
+MIN_REPEATS = 5
+# Hardware counters to show and their labels.
+COUNTERS = (
+    ('instructions', 'instructions'),
+    ('cycles', 'cycles'),
+    ('cache_misses', 'cache misses'),
+    ('branch_misses', 'branch misses'),
+)
+# A repeat with context switches or page faults is considered distorted by them
+# if it's that many times slower than the best repeat.
+DISTORTION = 1.1
+# Resource usage events that can distort timings, their descriptions, and
+# how many of them per second of CPU time a repeat must have to be blamed.
+# A few context switches happen on any system and cost only microseconds.
+DISTORTIONS = (
+    ('involuntary_switches', 'preempted', 'involuntary context switches', 50),
+    ('major_faults', 'major page faults', 'major page faults', 0),
+)
 
 
 class TimingResult(BaseResult):
     """The result of benchmarking a code execution time.
+
+    If `overhead` is specified, it is subtracted from all timings.
+    If `warmup_loops` is specified, the warmup is searched only among
+    that many first loop timings.
     """
-    __slots__ = ('_total_timings', '_each_timings', '_base_time')
+    __slots__ = (
+        '_total_timings',
+        '_each_timings',
+        '_base_time',
+        '_overhead',
+        '_comparison',
+        '_event_loop_timings',
+        '_counters',
+        '_warmup',
+        '_warmup_loops',
+        '_usage',
+    )
 
     _total_timings: list[float]
     _each_timings: list[float]
     _base_time: float | None
+    _overhead: Overhead | None
+    _comparison: Comparison | None
+    _event_loop_timings: list[float] | None
+    _counters: list[dict[str, float]] | None
+    _warmup: int | None
+    _warmup_loops: int | None
+    _usage: list[dict[str, float]] | None
 
     def __init__(
         self,
         total_timings: list[float],
         each_timings: list[float],
+        warmup_loops: int | None = None,
+        overhead: Overhead | None = None,
+        event_loop_timings: list[float] | None = None,
+        counters: list[dict[str, float]] | None = None,
+        usage: list[dict[str, float]] | None = None,
     ) -> None:
+        if overhead is not None:
+            total_timings = [max(0, t - overhead.total) for t in total_timings]
+            each_timings = [max(0, t - overhead.each) for t in each_timings]
         self._total_timings = total_timings
         self._each_timings = each_timings
         self._base_time = None
+        self._overhead = overhead
+        self._comparison = None
+        self._event_loop_timings = event_loop_timings
+        self._counters = counters
+        self._warmup = None
+        self._warmup_loops = warmup_loops
+        self._usage = usage
 
     @property
     def total_timings(self) -> list[float]:
@@ -37,29 +102,166 @@ class TimingResult(BaseResult):
         """
         return self._each_timings
 
+    @property
+    def warmup(self) -> int:
+        """How many first loops were detected as the warmup.
+
+        These loops are noticeably slower than the steady state and aren't
+        included in the loop-based statistics, like `stdev`.
+        """
+        if self._warmup is None:
+            timings = self._each_timings[:self._warmup_loops]
+            self._warmup = find_warmup(timings)
+        return self._warmup
+
+    @property
+    def steady_timings(self) -> list[float]:
+        """Execution time of each loop after the warmup.
+        """
+        return self._each_timings[self.warmup:]
+
+    @property
+    def event_loop_timings(self) -> list[float] | None:
+        """Average time per loop the async benchmark waited for the event loop.
+
+        The time is recorded for each repeat and isn't included in `total_timings`.
+        It's None for sync benchmarks.
+        """
+        return self._event_loop_timings
+
+    @property
+    def counters(self) -> list[dict[str, float]] | None:
+        """Average hardware counters values per loop for each repeat.
+
+        It's None if hardware counters weren't enabled.
+        Events not supported by the CPU are missing.
+        """
+        return self._counters
+
+    @property
+    def best_counters(self) -> dict[str, float]:
+        """The lowest value per loop of each hardware counter across all repeats.
+        """
+        result: dict[str, float] = {}
+        for counts in self._counters or []:
+            for name, value in counts.items():
+                result[name] = min(value, result.get(name, value))
+        return result
+
+    @property
+    def usage(self) -> list[dict[str, float]] | None:
+        """Resource usage of all loops for each repeat.
+
+        Includes user and system CPU time (in seconds), minor and major
+        page faults, voluntary and involuntary context switches,
+        and block I/O operations. It's None if the platform doesn't provide it.
+        """
+        return self._usage
+
     @property
     def best(self) -> float:
         """The best of all total timings (repeats).
         """
         return min(self._total_timings)
 
+    @property
+    def overhead(self) -> float:
+        """The measured overhead of the looper subtracted from each loop.
+
+        It is 0 if the looper wasn't calibrated.
+        """
+        if self._overhead is None:
+            return 0
+        return self._overhead.total
+
+    @property
+    def floor(self) -> float:
+        """The variation of the looper overhead that cannot be subtracted.
+
+        Differences between timings smaller than that are not meaningful.
+        It is 0 if the looper wasn't calibrated.
+        """
+        if self._overhead is None:
+            return 0
+        return self._overhead.floor
+
     @property
     def stdev(self) -> float:
-        """Standard deviation of loops in a single repeat.
+        """Standard deviation of loops in a single repeat, excluding the warmup.
 
         If there is only one loop in each repeat, use all repeats instead.
         """
-        ts = self._each_timings
+        ts = self.steady_timings
         if len(ts) == 1:
             ts = self._total_timings
         mean = math.fsum(ts) / len(ts)
         return (math.fsum((t - mean) ** 2 for t in ts) / len(ts)) ** 0.5
 
+    def compare(self, base: TimingResult) -> Comparison:
+        """Compare timings with the base result, taking the noise into account.
+
+        Total timings (repeats) are compared if both results have enough of them.
+        Otherwise, loop timings are compared which are more noisy
+        because each of them includes the timer overhead.
+        """
+        samples = self._total_timings
+        base_samples = base._total_timings
+        if min(len(samples), len(base_samples)) < MIN_REPEATS:
+            samples = self.steady_timings
+            base_samples = base.steady_timings
+        return compare(samples, base_samples)
+
+    def to_dict(self) -> dict[str, Any]:
+        result = dict(
+            best=self.best,
+            stdev=self.stdev,
+            total_timings=self._total_timings,
+            loop_timings=self._each_timings,
+            warmup=self.warmup,
+            overhead=self.overhead,
+            floor=self.floor,
+        )
+        if self._event_loop_timings is not None:
+            result['event_loop_timings'] = self._event_loop_timings
+        if self._counters is not None:
+            result['counters'] = self._counters
+        if self._usage is not None:
+            result['usage'] = self._usage
+        if self._comparison is not None:
+            result['comparison'] = self._comparison.to_dict()
+        return result
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> TimingResult:
+        result = cls(
+            total_timings=data['total_timings'],
+            each_timings=data['loop_timings'],
+            event_loop_timings=data.get('event_loop_timings'),
+            counters=data.get('counters'),
+            usage=data.get('usage'),
+        )
+        # The warmup could've been searched only among the first loops.
+        result._warmup = data.get('warmup')
+        # Timings are stored with the overhead already subtracted.
+        if data['overhead'] or data['floor']:
+            result._overhead = Overhead(
+                total=data['overhead'],
+                each=0,
+                floor=data['floor'],
+            )
+        return result
+
     def format_histogram(self, limit: int = 64, lines: int = 2) -> str:
         """Histogram of timings (repeats).
+
+        If there are more repeats than `limit`, each bar is the average
+        of several consecutive repeats.
         """
-        assert len(self._total_timings) <= limit
-        return make_histogram(self._total_timings, lines=lines)
+        bars = [
+            math.fsum(chunk) / len(chunk)
+            for chunk in chunks(self._total_timings, limit)
+        ]
+        return make_histogram(bars, lines=lines)
 
     def format_text(self) -> str:
         """Represent the timing result as a human-friendly text.
@@ -70,32 +272,114 @@ class TimingResult(BaseResult):
             best=format_time(self.best),
             stdev=format_time(self.stdev),
         )
-        if self._base_time is not None:
+        if self._base_time is not None and (self.best <= 0 or self._base_time <= 0):
+            # After subtracting the overhead, either time can be 0,
+            # and the ratio can't be calculated.
+            result += f' {colors.yellow("below measurement floor")}'
+        elif self._base_time is not None:
+            noise = self._comparison is not None and not self._comparison.significant
             good = self.best < self._base_time
             if good:
                 ratio = round(self._base_time / self.best, 2)
                 ratio_text = f'/{ratio:.02f}'
-                result += f' {colors.green(ratio_text, rjust=8)} faster'
+                color = colors.yellow if noise else colors.green
+                result += f' {color(ratio_text, rjust=8)} faster'
             else:
                 ratio = round(self.best / self._base_time, 2)
                 ratio_text = f'x{ratio:.02f}'
-                result += f' {colors.red(ratio_text, rjust=8)} slower'
+                color = colors.yellow if noise else colors.red
+                result += f' {color(ratio_text, rjust=8)} slower'
+            if noise:
+                result += ' (not significant)'
+        if self._event_loop_timings:
+            event_loop = format_time(median(self._event_loop_timings))
+            result += f' + {event_loop.strip()} in event loop'
+        if self._counters:
+            result += '\n    ' + self._format_counters()
+        return result
+
+    def _format_usage_warnings(self) -> list[str]:
+        """Warn about repeats slowed down by context switches or page faults.
+        """
+        if not self._usage or len(self._usage) != len(self._total_timings):
+            return []
+        best = self.best
+        if best <= 0:
+            return []
+        result = []
+        for field, warn, events, rate in DISTORTIONS:
+            slowdowns = []
+            for timing, usage in zip(self._total_timings, self._usage):
+                if timing <= best * DISTORTION:
+                    continue
+                count = usage.get(field, 0)
+                cpu_time = usage.get('user', 0) + usage.get('system', 0)
+                if count > 0 and count >= rate * cpu_time:
+                    slowdowns.append(timing / best)
+            if not slowdowns:
+                continue
+            descr = '{count} of {total} repeats had {events}, up to x{ratio:.1f} slower'
+            descr = descr.format(
+                count=len(slowdowns),
+                total=len(self._total_timings),
+                events=events,
+                ratio=max(slowdowns),
+            )
+            result.append(f'{colors.yellow(warn)}: {descr}')
         return result
 
+    def _format_counters(self) -> str:
+        """Represent hardware counters per loop as a human-friendly text.
+        """
+        counts = self.best_counters
+        parts = []
+        for name, label in COUNTERS:
+            if name not in counts:
+                continue
+            value = colors.cyan(format_amount(counts[name]), rjust=5)
+            parts.append(f'{value} {label}')
+            if name == 'cycles' and counts[name] and 'instructions' in counts:
+                ipc = counts['instructions'] / counts['cycles']
+                parts.append(f'{colors.cyan(f"{ipc:.2f}")} IPC')
+        return ', '.join(parts) + ' per loop'
+
     def format_warnings(self) -> list[str]:
         result = []
 
         first = self._each_timings[0]
         second = self._each_timings[1]
-        if second != 0 and first > 1e-6:
+        warmup = self.warmup
+        if warmup >= 1:
+            steady = median(self.steady_timings)
+            slow = math.fsum(self._each_timings[:warmup]) / warmup
+            warn = 'warmup detected'
+            if warmup == 1:
+                descr = 'first iteration excluded'
+            else:
+                descr = f'first {warmup} iterations excluded'
+            if steady > 0:
+                descr += f', x{slow / steady:.1f} slower on average'
+            result.append(f'{colors.yellow(warn)}: {descr}')
+        elif second != 0 and first > 1e-6:
             ratio = first / second
             if ratio > 2:
                 warn = 'possible caching detected'
                 descr = f'first iteration x{ratio:.0f} slower than second'
                 result.append(f'{colors.yellow(warn)}: {descr}')
 
-        fastest = min(self._each_timings)
+        result.extend(self._format_usage_warnings())
+
+        if self._overhead is not None and self.best < self.floor * NEAR_FLOOR:
+            warn = 'close to the measurement floor'
+            descr = f'overhead variation is {format_time(self.floor).strip()}'
+            result.append(f'{colors.yellow(warn)}: {descr}')
+
+        steady_timings = self.steady_timings
+        fastest = min(steady_timings)
         if fastest == 0:
+            # After subtracting the overhead, 0 is a valid time.
+            if self._overhead is not None:
+                return result
             warn = 'the fastest time is 0'
             descr = 'the timer function is not detailed enough'
             result.append(f'{colors.yellow(warn)}: {descr}')
@@ -106,7 +390,7 @@ class TimingResult(BaseResult):
             descr = 'the timer function is not monotonic'
             result.append(f'{colors.yellow(warn)}: {descr}')
 
-        slowest = max(self._each_timings)
+        slowest = max(steady_timings)
         if slowest > 1e-6:
             ratio = slowest / fastest
             if ratio > 4:
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import sys
+
+
+try:
+    import resource
+except ImportError:
+    resource = None  # type: ignore[assignment]
+
+
+# Fields of the resource usage to record and the struct fields they come from.
+FIELDS = (
+    ('user', 'ru_utime'),
+    ('system', 'ru_stime'),
+    ('minor_faults', 'ru_minflt'),
+    ('major_faults', 'ru_majflt'),
+    ('voluntary_switches', 'ru_nvcsw'),
+    ('involuntary_switches', 'ru_nivcsw'),
+    ('block_in', 'ru_inblock'),
+    ('block_out', 'ru_oublock'),
+)
+
+
+def get_usage() -> tuple[float, ...] | None:
+    """Resource usage of the current thread (or process, if not supported).
+
+    None if the platform doesn't provide it.
+    """
+    if resource is None:
+        return None
+    who = getattr(resource, 'RUSAGE_THREAD', resource.RUSAGE_SELF)
+    usage = resource.getrusage(who)
+    return tuple(getattr(usage, attr) for _, attr in FIELDS)
+
+
+def get_usage_diff(
+    before: tuple[float, ...] | None,
+    after: tuple[float, ...] | None,
+) -> dict[str, float]:
+    """How much of each resource was used between two `get_usage` calls.
+
+    CPU times (`user` and `system`) are in seconds, everything else is a count.
+    """
+    if before is None or after is None:
+        return {}
+    return {
+        name: a - b
+        for (name, _), a, b in zip(FIELDS, after, before)
+    }
+
+
+def get_max_rss() -> int | None:
+    """The peak resident set size of the current process in bytes.
+
+    None if the platform doesn't provide it.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports it in bytes, other systems in kilobytes
+    if sys.platform == 'darwin':
+        return rss
+    return rss * 1024
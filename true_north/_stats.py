@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from random import Random
+from statistics import median
+from typing import Any, Callable, Sequence
+
+
+# Two-sided 95% critical values of Student's t-distribution
+# for 1..30 degrees of freedom. For more, the normal distribution is used.
+T_95 = (
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+)
+Z_95 = 1.960
+
+
+def t_critical(df: int) -> float:
+    """Two-sided 95% critical value of the t-distribution.
+    """
+    if df <= len(T_95):
+        return T_95[df - 1]
+    return Z_95
+
+
+def relative_ci(samples: Sequence[float]) -> float:
+    """Half-width of the 95% confidence interval of the mean relative to the median.
+
+    For example, 0.01 means that the true value is within ±1% of the median.
+    If there are not enough samples to tell, infinity is returned.
+    """
+    n = len(samples)
+    if n < 2:
+        return math.inf
+    mean = math.fsum(samples) / n
+    variance = math.fsum((x - mean) ** 2 for x in samples) / (n - 1)
+    half_width = t_critical(n - 1) * math.sqrt(variance / n)
+    if half_width == 0:
+        return 0
+    center = median(samples)
+    if center <= 0:
+        return math.inf
+    return half_width / center
+
+
+# Significance level for comparisons.
+ALPHA = .05
+# How many samples to use at most for comparisons, to keep them fast.
+MAX_SAMPLES = 200
+BOOTSTRAP_RESAMPLES = 500
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """The result of comparing samples against the base samples.
+    """
+    # The ratio of medians. If more than 1, the samples are slower than the base.
+    ratio: float
+    # The bootstrap 95% confidence interval of the ratio.
+    low: float
+    high: float
+    # The p-value of the two-sided Mann-Whitney U test.
+    pvalue: float
+
+    @property
+    def significant(self) -> bool:
+        """True if the difference is not just noise.
+        """
+        if self.pvalue >= ALPHA:
+            return False
+        return not (self.low <= 1 <= self.high)
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(
+            ratio=self.ratio,
+            low=self.low,
+            high=self.high,
+            pvalue=self.pvalue,
+            significant=self.significant,
+        )
+
+
+def thin(samples: Sequence[float], limit: int = MAX_SAMPLES) -> list[float]:
+    """Take evenly spaced samples so that there are no more than `limit` of them.
+    """
+    step = max(1, math.ceil(len(samples) / limit))
+    return list(samples[::step])
+
+
+def mann_whitney(a: Sequence[float], b: Sequence[float]) -> float:
+    """The p-value of the two-sided Mann-Whitney U test.
+
+    Uses the normal approximation with the tie and continuity corrections.
+    """
+    n1 = len(a)
+    n2 = len(b)
+    items = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    # assign ranks, ties get the average rank
+    rank_sum = 0.
+    ties = 0.
+    i = 0
+    while i < len(items):
+        j = i
+        while j < len(items) and items[j][0] == items[i][0]:
+            j += 1
+        rank = (i + j + 1) / 2
+        rank_sum += rank * sum(1 for _, group in items[i:j] if group == 0)
+        count = j - i
+        ties += count ** 3 - count
+        i = j
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.
+    z = (abs(u - mean) - .5) / math.sqrt(variance)
+    return min(1., math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+def bootstrap_ratio(
+    a: Sequence[float],
+    b: Sequence[float],
+    resamples: int = BOOTSTRAP_RESAMPLES,
+) -> tuple[float, float]:
+    """The bootstrap 95% confidence interval of the ratio of medians of a to b.
+
+    The random generator is seeded, so the result is reproducible.
+    """
+    rnd = Random(0)
+    ratios = []
+    for _ in range(resamples):
+        base = median(rnd.choices(b, k=len(b)))
+        if base <= 0:
+            continue
+        ratios.append(median(rnd.choices(a, k=len(a))) / base)
+    if not ratios:
+        return 0., math.inf
+    ratios.sort()
+    low = ratios[int(len(ratios) * .025)]
+    high = ratios[min(len(ratios) - 1, int(len(ratios) * .975))]
+    return low, high
+
+
+def compare(samples: Sequence[float], base: Sequence[float]) -> Comparison:
+    """Compare samples against the base samples.
+    """
+    samples = thin(samples)
+    base = thin(base)
+    base_median = median(base)
+    ratio = median(samples) / base_median if base_median > 0 else math.inf
+    low, high = bootstrap_ratio(samples, base)
+    return Comparison(
+        ratio=ratio,
+        low=low,
+        high=high,
+        pvalue=mann_whitney(samples, base),
+    )
+
+
+# The minimum number of loop timings to look for the warmup in.
+WARMUP_MIN_LOOPS = 10
+# The maximum share of loops that can be the warmup.
+WARMUP_MAX_SHARE = .25
+# For more loop timings, the search runs on averages of blocks of loops.
+WARMUP_MAX_POINTS = 10_000
+# How much slower warmup loops must be than most of the steady state loops.
+WARMUP_MIN_RATIO = 1.1
+
+
+def find_warmup(timings: Sequence[float]) -> int:
+    """The number of first loops to exclude as the warmup.
+
+    Finds a single change point that best splits timings into two segments
+    with different means (least squares, using prefix sums), and accepts it
+    only if the improvement beats the BIC penalty and the median of loops
+    before it is noticeably higher than 75% of loops after it.
+    If the steady state is reached only after a quarter of all loops,
+    it's not a warmup but a change in the benchmark behavior.
+
+    Timings are compared on the log scale, so that rare very slow loops
+    (interrupts, context switches) don't shift the means too much.
+    """
+    if len(timings) < WARMUP_MIN_LOOPS:
+        return 0
+    if min(timings) > 0:
+        values = list(map(math.log, timings))
+    else:
+        # after subtracting the overhead, some timings can be 0
+        floor = min((t for t in timings if t > 0), default=0.)
+        if floor <= 0:
+            return 0
+        values = [math.log(max(t, floor)) for t in timings]
+    block = math.ceil(len(values) / WARMUP_MAX_POINTS)
+    if block > 1:
+        values = [
+            math.fsum(values[i:i + block]) / len(values[i:i + block])
+            for i in range(0, len(values), block)
+        ]
+    n = len(values)
+    sums = [0.]
+    squares = [0.]
+    for value in values:
+        sums.append(sums[-1] + value)
+        squares.append(squares[-1] + value * value)
+
+    def sse(start: int, stop: int) -> float:
+        """The sum of squared errors of the segment around its mean.
+        """
+        total = sums[stop] - sums[start]
+        error = squares[stop] - squares[start] - total * total / (stop - start)
+        return max(error, 0.)
+
+    full = sse(0, n)
+    if full == 0:
+        return 0
+    best = 0
+    best_error = full
+    for k in range(1, n):
+        error = sse(0, k) + sse(k, n)
+        if error < best_error:
+            best = k
+            best_error = error
+    if best == 0 or best > n * WARMUP_MAX_SHARE:
+        return 0
+    # A change point adds 2 parameters: its position and the second mean.
+    gain = n * math.log(full / max(best_error, full * 1e-12))
+    if gain <= 2 * math.log(n):
+        return 0
+    warmup = best * block
+    steady = sorted(timings[warmup:])
+    upper_quartile = steady[len(steady) * 3 // 4]
+    if median(timings[:warmup]) < upper_quartile * WARMUP_MIN_RATIO:
+        return 0
+    return warmup
+
+
+# Complexity classes to fit the benchmark timings into.
+COMPLEXITIES: tuple[tuple[str, Callable[[float], float]], ...] = (
+    ('O(1)', lambda n: 1.),
+    ('O(log n)', lambda n: math.log2(n)),
+    ('O(n)', lambda n: n),
+    ('O(n log n)', lambda n: n * math.log2(n)),
+    ('O(n²)', lambda n: n * n),
+)
+
+
+@dataclass(frozen=True)
+class Fit:
+    """How well timings fit a complexity class.
+    """
+    # The name of the complexity class, like "O(n)".
+    name: str
+    # The time for a unit of work, so that `time = coef * f(n)`.
+    coef: float
+    # Root mean square of residuals relative to the mean time.
+    rms: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return dict(name=self.name, coef=self.coef, rms=self.rms)
+
+
+def fit_complexity(sizes: Sequence[int], times: Sequence[float]) -> list[Fit]:
+    """Fit timings to each complexity class, the best fit first.
+
+    The coefficient is found using the least squares method,
+    the same way as Google Benchmark does it.
+    """
+    mean = math.fsum(times) / len(times)
+    fits = []
+    for name, func in COMPLEXITIES:
+        values = [func(n) for n in sizes]
+        squares = math.fsum(v * v for v in values)
+        if squares == 0:
+            continue
+        coef = math.fsum(v * t for v, t in zip(values, times)) / squares
+        residuals = math.fsum((t - coef * v) ** 2 for v, t in zip(values, times))
+        rms = math.sqrt(residuals / len(times))
+        fits.append(Fit(name=name, coef=coef, rms=rms / mean if mean else math.inf))
+    fits.sort(key=lambda fit: fit.rms)
+    return fits
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TextIO
+
+from ._colors import colors
+
+
+CPU_DIR = Path('/sys/devices/system/cpu')
+ASLR_PATH = Path('/proc/sys/kernel/randomize_va_space')
+# The system is noisy if the load average per CPU core is higher than that.
+MAX_LOAD = .5
+# The process priority (niceness) to set when asked for a higher priority.
+HIGH_PRIORITY = -10
+
+
+@dataclass(frozen=True)
+class SystemCheck:
+    """The state of a single system setting affecting benchmarks.
+    """
+    name: str
+    # The current value of the setting, human-readable.
+    value: str
+    # False if it makes benchmarks noisy, None if it's not known.
+    ok: bool | None
+    # How to fix it, if not ok.
+    advice: str = ''
+
+    def format_text(self) -> str:
+        if self.ok is None:
+            status = colors.blue('?', rjust=2)
+        elif self.ok:
+            status = colors.green('ok', rjust=2)
+        else:
+            status = colors.red('!!', rjust=2)
+        result = f'{status} {self.name}: {self.value}'
+        if self.advice and self.ok is not True:
+            result += f' ({self.advice})'
+        return result
+
+
+def _read(path: Path) -> str | None:
+    try:
+        return path.read_text().strip()
+    except OSError:
+        return None
+
+
+def parse_cpu_list(text: str) -> list[int]:
+    """Parse the list of CPUs in the kernel format, like "0-2,5".
+    """
+    cpus: list[int] = []
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def get_governors() -> set[str]:
+    """CPU frequency scaling governors used by CPU cores.
+    """
+    governors = set()
+    for path in CPU_DIR.glob('cpu[0-9]*/cpufreq/scaling_governor'):
+        governor = _read(path)
+        if governor:
+            governors.add(governor)
+    return governors
+
+
+def get_turbo() -> bool | None:
+    """True if turbo boost is enabled, None if not known.
+    """
+    no_turbo = _read(CPU_DIR / 'intel_pstate' / 'no_turbo')
+    if no_turbo is not None:
+        return no_turbo == '0'
+    boost = _read(CPU_DIR / 'cpufreq' / 'boost')
+    if boost is not None:
+        return boost == '1'
+    return None
+
+
+def get_isolated_cpus() -> list[int] | None:
+    """CPU cores isolated from the scheduler (isolcpus), None if not known.
+    """
+    isolated = _read(CPU_DIR / 'isolated')
+    if isolated is None:
+        return None
+    return parse_cpu_list(isolated)
+
+
+def get_load() -> float | None:
+    """The load average for the last minute, None if not known.
+    """
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return None
+
+
+def get_aslr() -> int | None:
+    """The address space layout randomization mode, 0 if disabled.
+    """
+    value = _read(ASLR_PATH)
+    if value is None or not value.isdigit():
+        return None
+    return int(value)
+
+
+def check_system() -> list[SystemCheck]:
+    """Check all system settings that can make benchmarks noisy.
+    """
+    checks = []
+
+    governors = get_governors()
+    if governors:
+        checks.append(SystemCheck(
+            name='CPU frequency governor',
+            value=', '.join(sorted(governors)),
+            ok=governors == {'performance'},
+            advice='run `cpupower frequency-set -g performance`',
+        ))
+    else:
+        checks.append(SystemCheck('CPU frequency governor', 'unknown', ok=None))
+
+    turbo = get_turbo()
+    checks.append(SystemCheck(
+        name='turbo boost',
+        value='unknown' if turbo is None else ('enabled' if turbo else 'disabled'),
+        ok=None if turbo is None else not turbo,
+        advice='' if turbo is None else 'disable it in BIOS or write 1 into no_turbo',
+    ))
+
+    isolated = get_isolated_cpus()
+    if isolated is None:
+        checks.append(SystemCheck('isolated CPUs', 'unknown', ok=None))
+    else:
+        checks.append(SystemCheck(
+            name='isolated CPUs',
+            value=', '.join(map(str, isolated)) or 'none',
+            # It's a recommendation, the system isn't noisy without it.
+            ok=True if isolated else None,
+            advice='boot with `isolcpus=` and run with `--pin`',
+        ))
+
+    load = get_load()
+    cpus = os.cpu_count() or 1
+    checks.append(SystemCheck(
+        name='load average',
+        value='unknown' if load is None else f'{load:.2f} for {cpus} CPUs',
+        ok=None if load is None else load <= cpus * MAX_LOAD,
+        advice='' if load is None else 'stop other programs',
+    ))
+
+    aslr = get_aslr()
+    checks.append(SystemCheck(
+        name='ASLR',
+        value='unknown' if aslr is None else ('disabled' if aslr == 0 else 'enabled'),
+        ok=None if aslr is None else aslr == 0,
+        advice='' if aslr is None else f'write 0 into {ASLR_PATH}',
+    ))
+    return checks
+
+
+def get_system_info() -> dict[str, Any]:
+    """The state of system settings affecting benchmarks, to store with results.
+    """
+    cpus = None
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = sorted(os.sched_getaffinity(0))
+    priority = None
+    if hasattr(os, 'getpriority'):
+        priority = os.getpriority(os.PRIO_PROCESS, 0)
+    return dict(
+        governors=sorted(get_governors()),
+        turbo=get_turbo(),
+        isolated_cpus=get_isolated_cpus(),
+        load=get_load(),
+        aslr=get_aslr(),
+        cpus=cpus,
+        priority=priority,
+    )
+
+
+def print_system_warnings(stream: TextIO) -> bool:
+    """Print a warning for each setting that makes benchmarks noisy.
+
+    Returns True if there were any.
+    """
+    noisy = [check for check in check_system() if check.ok is False]
+    if not noisy:
+        return False
+    print(colors.yellow('the system is noisy, results may be unstable:'), file=stream)
+    for check in noisy:
+        print(f'  {check.format_text()}', file=stream)
+    return True
+
+
+def pin(cpu: int | None = None) -> int:
+    """Pin the current process to a single CPU core.
+
+    If the core isn't specified, the last isolated core is used or,
+    if there are none, the last core available for the process.
+    Isolated cores aren't available for processes by default,
+    the scheduler runs there only processes explicitly pinned to them.
+
+    The chosen core is returned. Raises OSError if pinning isn't supported.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        raise OSError('pinning to a CPU core is not supported on this platform')
+    if cpu is None:
+        candidates = get_isolated_cpus() or sorted(os.sched_getaffinity(0))
+        cpu = candidates[-1]
+    os.sched_setaffinity(0, {cpu})
+    return cpu
+
+
+def raise_priority() -> None:
+    """Make the scheduler prefer the current process over others.
+
+    Raises OSError (PermissionError) if not permitted, usually without root.
+    """
+    if not hasattr(os, 'setpriority'):
+        raise OSError('changing the priority is not supported on this platform')
+    os.setpriority(os.PRIO_PROCESS, 0, HIGH_PRIORITY)
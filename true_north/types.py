@@ -1,5 +1,8 @@
 from ._check import Check
-from ._results import BaseResult, MallocResult, OpcodesResult, TimingResult
+from ._results import (
+    BaseResult, ComplexityResult, LinesResult, MallocResult, MemoryResult,
+    OpcodesResult, ScalingResult, TimingResult,
+)
 
 
 __all__ = [
@@ -8,4 +11,8 @@ __all__ = [
     'TimingResult',
     'OpcodesResult',
     'MallocResult',
+    'ScalingResult',
+    'ComplexityResult',
+    'LinesResult',
+    'MemoryResult',
 ]